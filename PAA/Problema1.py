@@ -4,13 +4,28 @@
  Pedro Henrique Siman
  Victor Arrighi """
 
+import bisect
 import itertools
+import math
+import multiprocessing
+import os
+import random
+import sys
 import time
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+from array import array
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import telemetria
+from colunas import ler_colunas
+from telemetria import Estatisticas
+try:
+    import numpy as np
+except ImportError: #numpy é opcional, só o modo de encaixe "numpy" depende dele
+    np = None
 
 #CRAÇÃO DAS CLASSES
 class Peca:
+    __slots__ = ("id", "altura", "largura", "x", "y", "placa")
     def __init__(self, id, altura, largura):
         self.id = id
         self.altura = altura
@@ -21,25 +36,112 @@ class Peca:
     def perimetro(self):
         return 2 * (self.altura + self.largura)
 
+#MODOS DE ENCAIXE: "varredura" percorre a matriz posição a posição (versão original), "pontos" consulta só os cantos candidatos do índice de espaço livre,
+#"numpy" guarda a ocupação em um array com soma de prefixos 2D e avalia todas as posições de uma vez
+MODO_VARREDURA = "varredura"
+MODO_PONTOS = "pontos"
+MODO_NUMPY = "numpy"
+MODO_PADRAO = MODO_PONTOS
+
 class Placa:
-    def __init__(self, id):
+    __slots__ = ("id", "largura", "comprimento", "margem", "modo", "_matriz", "soma", "pecas", "custo_corte", "area_ocupada",
+                 "xs_inicio", "ys_inicio", "xs_fim", "ys_fim")
+    def __init__(self, id, modo=MODO_PADRAO):
         self.id = id
         self.largura = 300
         self.comprimento = 300
         self.margem = 10
-        self.matriz = [[False]*300 for _ in range(300)] #matriz de alocação da placa, cada item 300 linhas x 300 colunas. Se o item = false é um espaço livre
+        self.modo = modo
+        self._matriz = None #nos modos varredura e pontos a matriz só é montada (a partir das peças) quando alguém acessa placa.matriz
+        if modo == MODO_NUMPY:
+            if np is None:
+                raise ImportError("O modo de encaixe numpy precisa do pacote numpy instalado")
+            self._matriz = np.zeros((300, 300), dtype=bool)
+            self.soma = np.zeros((301, 301), dtype=np.int32) #soma[i][j] = células ocupadas em matriz[:i, :j]
+        elif modo not in (MODO_VARREDURA, MODO_PONTOS):
+            raise ValueError(f"Modo de encaixe desconhecido: {modo}")
         self.pecas = []
         self.custo_corte = 0
+        self.area_ocupada = 0 #parte da área útil coberta pelas peças, para descartar placas cheias sem procurar posição
+        #índice de espaço livre: coordenadas ordenadas onde pode começar (canto superior esquerdo) ou terminar (canto inferior direito) uma peça
+        self.xs_inicio = [self.margem]
+        self.ys_inicio = [self.margem]
+        self.xs_fim = [self.largura - self.margem]
+        self.ys_fim = [self.comprimento - self.margem]
+
+    @property
+    def matriz(self): #matriz de alocação da placa, cada item 300 linhas x 300 colunas. Se o item = false é um espaço livre
+        if self._matriz is None:
+            self._matriz = [[False]*300 for _ in range(300)]
+            for p in self.pecas:
+                for i in range(p.y, p.y + p.altura):
+                    for j in range(p.x, p.x + p.largura):
+                        self._matriz[i][j] = True
+        return self._matriz
+
+class Solucao: #retrato compacto de um layout: só a posição de cada peça, em colunas paralelas. As placas são remontadas quando alguém precisa delas
+    __slots__ = ("modo", "ids", "alturas", "larguras", "xs", "ys", "indices_placa", "custos_corte")
+    def __init__(self, placas):
+        self.modo = placas[0].modo if placas else MODO_PADRAO
+        self.ids = array('l')
+        self.alturas = array('l')
+        self.larguras = array('l')
+        self.xs = array('l')
+        self.ys = array('l')
+        self.indices_placa = array('l')
+        for indice, placa in enumerate(placas):
+            for p in placa.pecas:
+                self.ids.append(p.id)
+                self.alturas.append(p.altura)
+                self.larguras.append(p.largura)
+                self.xs.append(p.x)
+                self.ys.append(p.y)
+                self.indices_placa.append(indice)
+        self.custos_corte = array('d', [placa.custo_corte for placa in placas])
+    def __len__(self): #número de placas
+        return len(self.custos_corte)
+    def custo(self): #mesma conta de calcular_custo_total
+        return len(self.custos_corte) * 1000 + sum(self.custos_corte)
+    def placas(self):
+        if telemetria.atual is not None:
+            telemetria.atual.copias += 1
+        placas = [Placa(i, self.modo) for i in range(len(self.custos_corte))]
+        for k in range(len(self.ids)):
+            colocar_peca(placas[self.indices_placa[k]], Peca(self.ids[k], self.alturas[k], self.larguras[k]), self.xs[k], self.ys[k])
+        for placa, custo in zip(placas, self.custos_corte):
+            placa.custo_corte = custo
+        return placas
+
+class TabelaTransposicao: #memória limitada de estados já explorados pelo branch and bound, descartando o usado há mais tempo (LRU)
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self.estados = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+    def consultar(self, chave):
+        valor = self.estados.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        self.estados.move_to_end(chave)
+        return valor
+    def registrar(self, chave, valor):
+        self.estados[chave] = valor
+        self.estados.move_to_end(chave)
+        if len(self.estados) > self.capacidade:
+            self.estados.popitem(last=False)
+            self.remocoes += 1
+
+def chave_estado(placas, pecas_restantes): #forma canônica do estado parcial: dimensões restantes + retângulos ocupados em cada placa
+    restantes = tuple(sorted((p.altura, p.largura) for p in pecas_restantes))
+    layout = tuple(frozenset((p.x, p.y, p.largura, p.altura) for p in placa.pecas) for placa in placas)
+    return restantes, layout
 
 def ler_entrada(arquivo):
-    pecas = []
-    with open(arquivo, "r", encoding="utf-8") as f:
-        linhas = [linha.strip() for linha in f if linha.strip() != ""]
-        numero_de_pecas = int(linhas[0]) #leitura da primeira linha para definir quantas peças são
-        for i in range(1, numero_de_pecas + 1):
-            altura, largura = map(int, linhas[i].split())
-            pecas.append(Peca(i - 1, altura, largura))
-    return pecas
+    colunas = ler_colunas(arquivo) #alturas e larguras lidas direto em colunas, do formato texto ou do binário (ver colunas.py)
+    return [Peca(i, altura, largura) for i, (altura, largura) in enumerate(zip(colunas.alturas.tolist(), colunas.larguras.tolist()))]
 
 #FUNÇÕES DE ENCAIXE DAS PEÇAS NA PLACA
 def disponibilidade_peca(placa, peca, x, y): #verifica se a posição cabe na posição (x,y) da placa
@@ -50,176 +152,874 @@ def disponibilidade_peca(placa, peca, x, y): #verifica se a posição cabe na po
         return False, 0
     if y + peca.altura > placa.comprimento - placa.margem:
         return False, 0
-    for i in range(y, y + peca.altura): #verificação se existe alguma outra placa ocupando o lugar
-        for j in range(x, x + peca.largura):
-            if placa.matriz[i][j]:
-                return False, 0
+    if placa.modo == MODO_PONTOS:
+        if not retangulo_livre(placa, x, y, peca.largura, peca.altura):
+            return False, 0
+    elif placa.modo == MODO_NUMPY: #consulta em O(1) pela soma de prefixos
+        estatisticas = telemetria.atual
+        if estatisticas is not None:
+            estatisticas.posicoes_testadas += 1
+            estatisticas.celulas_varridas += 4
+        s = placa.soma
+        if s[y + peca.altura, x + peca.largura] - s[y, x + peca.largura] - s[y + peca.altura, x] + s[y, x] != 0:
+            return False, 0
+    else:
+        estatisticas = telemetria.atual
+        if estatisticas is not None:
+            estatisticas.posicoes_testadas += 1
+        matriz = placa.matriz #propriedade lida uma vez só, fora do laço por célula
+        for i in range(y, y + peca.altura): #verificação se existe alguma outra placa ocupando o lugar
+            for j in range(x, x + peca.largura):
+                if matriz[i][j]:
+                    if estatisticas is not None:
+                        estatisticas.celulas_varridas += (i - y) * peca.largura + (j - x) + 1
+                    return False, 0
+        if estatisticas is not None:
+            estatisticas.celulas_varridas += peca.altura * peca.largura
     custo = peca.perimetro() * 0.01
     return True, custo
 
+def retangulo_livre(placa, x, y, largura, altura): #testa sobreposição contra as peças já colocadas em vez de varrer células
+    estatisticas = telemetria.atual
+    if estatisticas is not None:
+        estatisticas.posicoes_testadas += 1
+    for p in placa.pecas:
+        if x < p.x + p.largura and p.x < x + largura and y < p.y + p.altura and p.y < y + altura:
+            return False
+    return True
+
 def colocar_peca(placa, peca, x, y): #marca na placa a posição da peça
     peca.x = x
     peca.y = y
     peca.placa = placa.id
-    for i in range(y, y + peca.altura):
-        for j in range(x, x + peca.largura):
-            placa.matriz[i][j] = True
+    if placa.modo == MODO_NUMPY:
+        placa.matriz[y:y + peca.altura, x:x + peca.largura] = True
+        somar_retangulo(placa, peca, x, y, 1)
+    elif placa._matriz is not None:
+        matriz = placa._matriz
+        for i in range(y, y + peca.altura):
+            for j in range(x, x + peca.largura):
+                matriz[i][j] = True
+    inserir_coordenada(placa.xs_inicio, x + peca.largura)
+    inserir_coordenada(placa.ys_inicio, y + peca.altura)
+    inserir_coordenada(placa.xs_fim, x)
+    inserir_coordenada(placa.ys_fim, y)
     custo = peca.perimetro() * 0.01
     placa.custo_corte += custo
+    placa.area_ocupada += area_na_placa(placa, peca)
     placa.pecas.append(peca)
     return custo
 
-def tentar_encaixar(placas, peca):
-    for placa in placas:
+def somar_retangulo(placa, peca, x, y, sinal): #modo numpy: atualiza só soma[y+1:, x+1:], a parte da soma de prefixos que o retângulo muda
+    #soma[i][j] ganha (células do retângulo em matriz[:i, :j]) = min(i - y, altura) * min(j - x, largura), cortado na borda da placa
+    linhas = np.minimum(np.arange(1, placa.soma.shape[0] - y, dtype=np.int32), peca.altura)
+    colunas = np.minimum(np.arange(1, placa.soma.shape[1] - x, dtype=np.int32), peca.largura)
+    placa.soma[y + 1:, x + 1:] += sinal * np.multiply.outer(linhas, colunas)
+
+def area_na_placa(placa, peca): #área que a peça cobre dentro da área útil (peças maiores que a placa são cortadas na margem)
+    return min(peca.largura, placa.largura - 2 * placa.margem) * min(peca.altura, placa.comprimento - 2 * placa.margem)
+
+def sem_espaco(placa, peca): #True quando a área livre da placa já é menor que a peça
+    return placa.area_ocupada + area_na_placa(placa, peca) > (placa.largura - 2 * placa.margem) * (placa.comprimento - 2 * placa.margem)
+
+def remover_peca(placa, peca): #desfaz colocar_peca, usado para voltar atrás na busca sem copiar as placas
+    placa.pecas.remove(peca)
+    if placa.modo == MODO_NUMPY:
+        placa.matriz[peca.y:peca.y + peca.altura, peca.x:peca.x + peca.largura] = False
+        somar_retangulo(placa, peca, peca.x, peca.y, -1)
+    elif placa._matriz is not None:
+        matriz = placa._matriz
+        for i in range(peca.y, peca.y + peca.altura):
+            for j in range(peca.x, peca.x + peca.largura):
+                matriz[i][j] = False
+    placa.xs_inicio = sorted({placa.margem} | {p.x + p.largura for p in placa.pecas})
+    placa.ys_inicio = sorted({placa.margem} | {p.y + p.altura for p in placa.pecas})
+    placa.xs_fim = sorted({placa.largura - placa.margem} | {p.x for p in placa.pecas})
+    placa.ys_fim = sorted({placa.comprimento - placa.margem} | {p.y for p in placa.pecas})
+    placa.area_ocupada -= area_na_placa(placa, peca)
+    placa.custo_corte = 0 #refaz a soma na mesma ordem de colocar_peca para obter exatamente o mesmo valor de antes
+    for p in placa.pecas:
+        placa.custo_corte += p.perimetro() * 0.01
+
+def desfazer_encaixe(placas, peca, n_placas): #desfaz tentar_encaixar, removendo a placa que tenha sido aberta para a peça
+    remover_peca(placas[peca.placa], peca)
+    del placas[n_placas:]
+
+def inserir_coordenada(coordenadas, valor): #mantém a lista ordenada e sem repetição
+    i = bisect.bisect_left(coordenadas, valor)
+    if i == len(coordenadas) or coordenadas[i] != valor:
+        coordenadas.insert(i, valor)
+
+#BUSCA DE POSIÇÕES LIVRES
+#A primeira posição livre na ordem de varredura (menor y, depois menor x) sempre encosta na margem ou na borda inferior/direita de outra peça,
+#por isso basta testar os cantos do índice. Do mesmo modo, a posição de menor sobra (maior x + y) encosta na margem ou na borda superior/esquerda de outra peça.
+def janelas_livres(placa, peca): #modo numpy: matriz booleana livres[y - margem][x - margem] com todas as posições avaliadas de uma vez, ou None se a peça não cabe na área útil
+    m = placa.margem
+    a = peca.altura
+    l = peca.largura
+    y_max = placa.comprimento - m - a
+    x_max = placa.largura - m - l
+    if y_max < m or x_max < m:
+        return None
+    s = placa.soma
+    ocupadas = (s[m + a:y_max + a + 1, m + l:x_max + l + 1] - s[m:y_max + 1, m + l:x_max + l + 1]
+                - s[m + a:y_max + a + 1, m:x_max + 1] + s[m:y_max + 1, m:x_max + 1])
+    estatisticas = telemetria.atual
+    if estatisticas is not None:
+        estatisticas.posicoes_testadas += ocupadas.size
+        estatisticas.celulas_varridas += 4 * ocupadas.size
+    return ocupadas == 0
+
+def primeira_posicao_livre(placa, peca): #retorna (x, y) da primeira posição livre de cima para baixo, da esquerda para direita, ou None
+    if telemetria.atual is not None:
+        telemetria.atual.encaixes_tentados += 1
+    if sem_espaco(placa, peca):
+        return None
+    x_max = placa.largura - placa.margem - peca.largura
+    y_max = placa.comprimento - placa.margem - peca.altura
+    if placa.modo == MODO_NUMPY:
+        livres = janelas_livres(placa, peca)
+        if livres is None or not livres.any():
+            return None
+        i, j = divmod(int(livres.argmax()), livres.shape[1]) #argmax devolve o primeiro True na ordem de varredura
+        return placa.margem + j, placa.margem + i
+    if placa.modo == MODO_VARREDURA:
+        for y in range(placa.margem, y_max + 1):
+            for x in range(placa.margem, x_max + 1):
+                pode, _ = disponibilidade_peca(placa, peca, x, y)
+                if pode:
+                    return x, y
+        return None
+    for y in placa.ys_inicio:
+        if y > y_max:
+            break
+        for x in placa.xs_inicio:
+            if x > x_max:
+                break
+            if retangulo_livre(placa, x, y, peca.largura, peca.altura):
+                return x, y
+    return None
+
+def melhor_posicao_livre(placa, peca): #retorna (sobra, x, y) da posição de menor sobra, desempatando pela ordem de varredura, ou None
+    melhor = None
+    if telemetria.atual is not None:
+        telemetria.atual.encaixes_tentados += 1
+    if sem_espaco(placa, peca):
+        return None
+    if placa.modo == MODO_NUMPY:
+        livres = janelas_livres(placa, peca)
+        if livres is None or not livres.any():
+            return None
+        soma_xy = np.add.outer(np.arange(livres.shape[0]), np.arange(livres.shape[1]))
+        i, j = divmod(int(np.where(livres, soma_xy, -1).argmax()), livres.shape[1]) #menor sobra = maior x + y, empate fica com a primeira na varredura
+        x = placa.margem + j
+        y = placa.margem + i
+        return (placa.largura - (x + peca.largura)) + (placa.comprimento - (y + peca.altura)), x, y
+    if placa.modo == MODO_VARREDURA:
         for y in range(placa.margem, placa.comprimento - placa.margem - peca.altura + 1):
             for x in range(placa.margem, placa.largura - placa.margem - peca.largura + 1):
-                pode, custo = disponibilidade_peca(placa, peca, x, y)
+                pode, _ = disponibilidade_peca(placa, peca, x, y)
                 if pode:
-                    colocar_peca(placa, peca, x, y)
-                    return True, custo
+                    sobra = (placa.largura - (x + peca.largura)) + (placa.comprimento - (y + peca.altura))
+                    if melhor is None or sobra < melhor[0]:
+                        melhor = (sobra, x, y)
+        return melhor
+    ys = sorted({y - peca.altura for y in placa.ys_fim if y - peca.altura >= placa.margem})
+    xs = sorted({x - peca.largura for x in placa.xs_fim if x - peca.largura >= placa.margem})
+    for y in ys:
+        for x in xs:
+            sobra = (placa.largura - (x + peca.largura)) + (placa.comprimento - (y + peca.altura))
+            if melhor is not None and sobra >= melhor[0]:
+                continue
+            if retangulo_livre(placa, x, y, peca.largura, peca.altura):
+                melhor = (sobra, x, y)
+    return melhor
+
+def tentar_encaixar(placas, peca):
+    if placas: # Mesmo teste de sem_espaco, com a conta da área feita uma vez só: placas cheias são puladas sem chamar a busca de posição
+        modelo = placas[0]
+        ocupacao_maxima = (modelo.largura - 2 * modelo.margem) * (modelo.comprimento - 2 * modelo.margem) - area_na_placa(modelo, peca)
+    for placa in placas:
+        if placa.area_ocupada > ocupacao_maxima:
+            continue
+        posicao = primeira_posicao_livre(placa, peca)
+        if posicao is not None:
+            x, y = posicao
+            return True, colocar_peca(placa, peca, x, y)
     #Tenta posições de cima para baxo, da esquerda para direita, se não couber em nenhum adiciona uma nova
-    nova_placa = Placa(len(placas))
+    nova_placa = Placa(len(placas), placas[0].modo if placas else MODO_PADRAO)
     placas.append(nova_placa)
     colocar_peca(nova_placa, peca, nova_placa.margem, nova_placa.margem)
     return True, peca.perimetro() * 0.01
 
 #CALCULOS E FUNÇÕES DE SUPORTE PARA A SOLUÇÃO FINAL
+EPSILON_CUSTO = 1e-6 #diferenças menores que isso são só arredondamento de ponto flutuante
 def calcular_custo_total(placas):
     custo_placas = len(placas) * 1000
     custo_cortes = sum(placa.custo_corte for placa in placas)
     return custo_placas + custo_cortes
 
+def limite_inferior_placas(pecas, placa_modelo=None): #nenhum layout usa menos placas que isso
+    placa = placa_modelo or Placa(0, MODO_PONTOS)
+    largura_util = placa.largura - 2 * placa.margem
+    altura_util = placa.comprimento - 2 * placa.margem
+    #limite por área: a parte de cada peça dentro da área útil (280x280) não pode se sobrepor à das outras
+    area = sum(min(p.largura, largura_util) * min(p.altura, altura_util) for p in pecas)
+    por_area = -(-area // (largura_util * altura_util))
+    #limite por peças grandes: duas peças com mais da metade da área útil nas duas dimensões nunca cabem na mesma placa
+    altas = [p for p in pecas if 2 * min(p.altura, altura_util) > altura_util]
+    largas = [p for p in pecas if 2 * min(p.largura, largura_util) > largura_util]
+    grandes = sum(1 for p in altas if 2 * min(p.largura, largura_util) > largura_util)
+    #peças com mais da metade da altura útil não podem ficar uma acima da outra, então na mesma placa ficam lado a lado (e vice-versa para as largas)
+    por_altas = -(-sum(min(p.largura, largura_util) for p in altas) // largura_util)
+    por_largas = -(-sum(min(p.altura, altura_util) for p in largas) // altura_util)
+    return max(1 if pecas else 0, por_area, grandes, por_altas, por_largas)
+
 def salvar_solucao(placas): #funcao para salvar a solucao do forca bruta. Necessária para a visualização correta na interface. Se isso não for feito a ultima permutação sempre será a mostrada.
-    novas = []
-    for p in placas:
-        novo = Placa(p.id)
-        novo.matriz = [linha[:] for linha in p.matriz]
-        novo.pecas = []
-        for pc in p.pecas:
-            copia = Peca(pc.id, pc.altura, pc.largura)
-            copia.x = pc.x
-            copia.y = pc.y
-            copia.placa = pc.placa
-            novo.pecas.append(copia)
-        novo.custo_corte = p.custo_corte
-        novas.append(novo)
-    return novas
+    if telemetria.atual is not None:
+        telemetria.atual.copias += 1
+    return Solucao(placas) # Guarda só as posições; solucao.placas() remonta as placas no fim
 
 #ALGORTIMOS DE EXECUÇÃO DAS SOLUÇÕES
-def forca_bruta(pecas):
+def forca_bruta(pecas, modo=MODO_PADRAO, estatisticas=None):
     inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
     melhor_custo = float('inf') #passa o valor infinito
     melhor_solucao = None
     total = 0
-    # gerar permutações
-    for permutacao in itertools.permutations(pecas): #gera todas permutações possíveis
-        total += 1
-        placas = [Placa(0)] #inicializa uma lista de placas para a possibilidade de precisar de mais de uma
-        for peca in permutacao:
-            encaixou, _ = tentar_encaixar(placas, peca)
+    with telemetria.coletar(estatisticas):
+        # gerar permutações
+        with estatisticas.fase("busca"):
+            for permutacao in itertools.permutations(pecas): #gera todas permutações possíveis
+                total += 1
+                placas = [Placa(0, modo)] #inicializa uma lista de placas para a possibilidade de precisar de mais de uma
+                for peca in permutacao:
+                    encaixou, _ = tentar_encaixar(placas, peca)
+                custo = calcular_custo_total(placas)
+                if custo < melhor_custo:
+                    melhor_custo = custo
+                    melhor_solucao = salvar_solucao(placas)
+        estatisticas.nos += total
+        with estatisticas.fase("reconstrucao"):
+            placas = melhor_solucao.placas() if melhor_solucao is not None else None
+    tempo = time.time() - inicio
+    print(f"Permutações testadas: {total}")
+    return melhor_custo, placas, tempo, estatisticas
+
+#FORÇA BRUTA PARALELA: cada processo recebe um prefixo das permutações e compartilha o melhor custo com os outros
+melhor_custo_compartilhado = None
+
+def iniciar_trabalhador(valor):
+    global melhor_custo_compartilhado
+    melhor_custo_compartilhado = valor
+
+def forca_bruta_prefixo(pecas, prefixo, modo, melhor_custo=float('inf'), orcamento=None, ao_melhorar=None, estatisticas=None): #percorre, na ordem do itertools.permutations, todas as permutações que começam com o prefixo
+    estatisticas = estatisticas or Estatisticas()
+    placas = [Placa(0, modo)]
+    melhor_solucao = None
+    total = 0
+
+    def explorar(restantes): # O estado das placas é compartilhado por todas as permutações com o mesmo prefixo, cada encaixe é desfeito na volta
+        nonlocal melhor_custo, melhor_solucao, total
+        if orcamento is not None and orcamento.consumir():
+            return
+        estatisticas.nos += 1
+        # O custo só cresce com as próximas peças: empate com o melhor local não ganha (vem depois na ordem), mas empate com outro processo pode ganhar
         custo = calcular_custo_total(placas)
-        if custo < melhor_custo:
+        if custo >= melhor_custo or (melhor_custo_compartilhado is not None and custo > melhor_custo_compartilhado.value):
+            estatisticas.podar("bound")
+            return
+        if not restantes:
+            total += 1
             melhor_custo = custo
             melhor_solucao = salvar_solucao(placas)
-    tempo = time.time() - inicio
-    print(f"Permutações testadas: {total}")
-    return melhor_custo, melhor_solucao, tempo
+            if melhor_custo_compartilhado is not None:
+                with melhor_custo_compartilhado.get_lock():
+                    if custo < melhor_custo_compartilhado.value:
+                        melhor_custo_compartilhado.value = custo
+            if ao_melhorar is not None:
+                ao_melhorar(melhor_custo, melhor_solucao)
+            return
+        for k, i in enumerate(restantes):
+            if orcamento is not None and orcamento.esgotado:
+                break # Prazo acabou em um filho: volta sem encaixar os irmãos que faltam
+            n_placas = len(placas)
+            tentar_encaixar(placas, pecas[i])
+            explorar(restantes[:k] + restantes[k+1:])
+            desfazer_encaixe(placas, pecas[i], n_placas)
+
+    with telemetria.coletar(estatisticas), estatisticas.fase("busca"):
+        for i in prefixo:
+            tentar_encaixar(placas, pecas[i])
+        explorar([i for i in range(len(pecas)) if i not in prefixo])
+    return melhor_custo, melhor_solucao, total, estatisticas
 
-def branch_and_bound(pecas):
+def forca_bruta_paralela(pecas, trabalhadores=None, modo=MODO_PADRAO, estatisticas=None): #mesmo resultado da forca_bruta, dividindo as permutações por prefixo entre processos
     inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    n = len(pecas)
+    profundidade = 0 # Prefixos suficientes para uns 4 por processo, assim quem termina cedo pega outro
+    while profundidade < n and math.perm(n, profundidade) < 4 * trabalhadores:
+        profundidade += 1
+    prefixos = list(itertools.permutations(range(n), profundidade))
+    valor = multiprocessing.Value('d', float('inf'))
     melhor_custo = float('inf')
     melhor_solucao = None
-    total_nos = 0
-
-    def copiar_placas(placas):
-        novas = []
-        for p in placas:
-            novo = Placa(p.id)
-            novo.matriz = [linha[:] for linha in p.matriz]
-            novo.pecas = []
-            for pc in p.pecas:
-                copia = Peca(pc.id, pc.altura, pc.largura)
-                copia.x = pc.x
-                copia.y = pc.y
-                copia.placa = pc.placa
-                novo.pecas.append(copia)
-            novo.custo_corte = p.custo_corte
-            novas.append(novo)
-        return novas
-    def calcular_bound(placas, pecas_restantes): # Calcula um Bound otimista (Assume que não precisará de NENHUMA placa nova para o resto): Custo atual + (perímetro restante * 0.01)
-        custo_placas = len(placas) * 1000
+    total = 0
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("busca"), ProcessPoolExecutor(max_workers=trabalhadores, initializer=iniciar_trabalhador, initargs=(valor,)) as executor:
+            resultados = executor.map(forca_bruta_prefixo, itertools.repeat(pecas), prefixos, itertools.repeat(modo))
+            for custo, solucao, contagem, estatisticas_prefixo in resultados: # Em ordem de prefixo: no empate fica a permutação que a versão serial encontraria primeiro
+                total += contagem
+                estatisticas.somar(estatisticas_prefixo, "trabalhadores/")
+                if custo < melhor_custo:
+                    melhor_custo = custo
+                    melhor_solucao = solucao
+        with estatisticas.fase("reconstrucao"):
+            placas = melhor_solucao.placas() if melhor_solucao is not None else None
+    tempo = time.time() - inicio
+    print(f"Permutações avaliadas até o fim: {total}")
+    return melhor_custo, placas, tempo, estatisticas
+
+TAMANHO_TABELA_PADRAO = 100000 #estados guardados na tabela de transposição (cerca de 0,5 KB cada)
+
+def ramificacoes(pecas_restantes): #índices das peças a tentar como próxima: peças com as mesmas dimensões geram o mesmo layout, basta ramificar uma delas
+    dimensoes_tentadas = set()
+    for i, peca in enumerate(pecas_restantes):
+        if (peca.altura, peca.largura) not in dimensoes_tentadas:
+            dimensoes_tentadas.add((peca.altura, peca.largura))
+            yield i
+
+class BuscaBranchAndBound: #estado do branch and bound, compartilhado pelas chamadas recursivas (e entre processos na versão paralela, pelo incumbente compartilhado)
+    def __init__(self, pecas, tabela, melhor_custo, melhor_solucao=None, compartilhado=None, estatisticas=None):
+        self.tabela = tabela
+        self.estatisticas = estatisticas or Estatisticas()
+        self.melhor_custo = melhor_custo
+        self.melhor_solucao = melhor_solucao
+        self.compartilhado = compartilhado
+        self.minimo_placas = limite_inferior_placas(pecas)
+        self.total_nos = 0
+        self.orcamento_raiz = None #se definido, a raiz para de ramificar após esse número de nós e guarda os filhos que faltam em self.sobras
+        self.sobras = []
+        self.orcamento = None #OrcamentoBusca do modo anytime
+        self.ao_melhorar = None #chamada com (custo, placas) a cada incumbente melhor
+
+    def incumbente(self): #melhor custo conhecido, incluindo o que os outros processos já encontraram
+        if self.compartilhado is None:
+            return self.melhor_custo
+        return min(self.melhor_custo, self.compartilhado.value)
+
+    def calcular_bound(self, placas, pecas_restantes): # Calcula um Bound otimista: nunca menos placas que o limite inferior de área/peças grandes + custo de corte atual + (perímetro restante * 0.01)
+        # O espaço livre só diminui, então as peças que já não cabem em nenhuma placa aberta vão precisar de placas novas
+        sem_lugar = [p for p in pecas_restantes if all(primeira_posicao_livre(placa, p) is None for placa in placas)]
+        custo_placas = max(len(placas) + limite_inferior_placas(sem_lugar), self.minimo_placas) * 1000
         custo_corte_atual = sum(placa.custo_corte for placa in placas)
         corte_restante = sum(p.perimetro() for p in pecas_restantes) * 0.01
         return custo_placas + custo_corte_atual + corte_restante
 
-    def bb_recursivo(pecas_restantes, placas):
-        nonlocal melhor_custo, melhor_solucao, total_nos
-        total_nos += 1
+    def registrar_solucao(self, placas, custo):
+        self.melhor_custo = custo
+        self.melhor_solucao = salvar_solucao(placas) # Só copia o layout quando encontra uma solução melhor
+        if self.compartilhado is not None: # Avisa os outros processos para que a poda fique mais forte em todos
+            with self.compartilhado.get_lock():
+                if custo < self.compartilhado.value:
+                    self.compartilhado.value = custo
+        if self.ao_melhorar is not None:
+            self.ao_melhorar(custo, self.melhor_solucao)
+
+    def explorar(self, pecas_restantes, placas, raiz=False): # Todas as chamadas compartilham a mesma lista de placas: cada encaixe é desfeito ao voltar da recursão
+        if self.orcamento is not None and self.orcamento.consumir():
+            return
+        self.total_nos += 1
+        self.estatisticas.nos += 1
+        # Ordens diferentes das mesmas peças costumam levar ao mesmo layout: se o estado já foi explorado com um incumbente
+        # igual ou pior que o atual, a subárvore dele não tem nada melhor a oferecer
+        chave = chave_estado(placas, pecas_restantes) if pecas_restantes else None
+        if chave is not None:
+            limite_guardado = self.tabela.consultar(chave)
+            if limite_guardado is not None and limite_guardado >= self.incumbente() - EPSILON_CUSTO:
+                self.estatisticas.podar("tabela")
+                return
         # Poda
-        bound = calcular_bound(placas, pecas_restantes)
-        if bound >= melhor_custo:
+        bound = self.calcular_bound(placas, pecas_restantes)
+        if bound >= self.incumbente() - EPSILON_CUSTO: # Tolerância porque o custo de corte é o mesmo em todo layout completo, só a ordem da soma muda
+            self.estatisticas.podar("bound")
             return
         # Caso base: Nenhuma peça restante -> Solução completa encontrada
         if not pecas_restantes:
             custo_final = calcular_custo_total(placas)
-            if custo_final < melhor_custo:
-                melhor_custo = custo_final
-                melhor_solucao = copiar_placas(placas)
+            if custo_final < self.incumbente():
+                self.registrar_solucao(placas, custo_final)
             return
-        for i, peca in enumerate(pecas_restantes):# RAMIFICAÇÃO: Tenta cada peça restante como a "próxima", simula as permutações que o Força Bruta faz, mas cortando caminhos ruins            
+        filhos = list(ramificacoes(pecas_restantes))
+        for k, i in enumerate(filhos):# RAMIFICAÇÃO: Tenta cada peça restante como a "próxima", simula as permutações que o Força Bruta faz, mas cortando caminhos ruins
+            if raiz and self.orcamento_raiz is not None and self.total_nos > self.orcamento_raiz:
+                self.sobras = [pecas_restantes[j] for j in filhos[k:]]
+                return # Subárvore incompleta: não vai para a tabela de transposição
+            if self.orcamento is not None and self.orcamento.esgotado:
+                return # Prazo acabou em um filho: volta sem encaixar os irmãos que faltam (nem registrar na tabela)
+            peca = pecas_restantes[i]
             # Cria nova lista de pendentes sem a peça atual
             novas_pendentes = pecas_restantes[:i] + pecas_restantes[i+1:]
-            novo_estado = copiar_placas(placas)
-            encaixou, _ = tentar_encaixar(novo_estado, peca)            
-            if encaixou:
-                bb_recursivo(novas_pendentes, novo_estado)
-            else:
-                # Opção 2: Se não coube em nenhuma, SÓ ENTÃO abre nova placa.
-                novo_estado_placa = copiar_placas(placas)
-                nova_placa = Placa(len(novo_estado_placa))
-                novo_estado_placa.append(nova_placa)
-                # Coloca na nova placa
-                colocar_peca(nova_placa, peca, nova_placa.margem, nova_placa.margem)  
-                bb_recursivo(novas_pendentes, novo_estado_placa)
-    placas_iniciais = [Placa(0)]
-    # Inicia passando TODAS as peças como "restantes"
-    bb_recursivo(pecas, placas_iniciais)
+            n_placas = len(placas)
+            tentar_encaixar(placas, peca) # Se não couber em nenhuma placa, tentar_encaixar abre uma nova
+            self.explorar(novas_pendentes, placas)
+            desfazer_encaixe(placas, peca, n_placas)
+        if self.orcamento is not None and self.orcamento.esgotado:
+            return # Busca interrompida: a subárvore ficou incompleta
+        self.tabela.registrar(chave, self.incumbente()) # Subárvore toda explorada: nada abaixo deste estado custa menos que o incumbente atual
+
+def branch_and_bound(pecas, modo=MODO_PADRAO, tabela=None, estatisticas=None):
+    inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    if tabela is None:
+        tabela = TabelaTransposicao(TAMANHO_TABELA_PADRAO)
+    with telemetria.coletar(estatisticas):
+        # Solução inicial vinda da heurística (com cópias das peças, pois a busca altera as posições das originais)
+        with estatisticas.fase("heuristica_inicial"):
+            custo_h, placas_h, _, _ = heuristica_best_fit([Peca(p.id, p.altura, p.largura) for p in pecas], modo, estatisticas)
+            busca = BuscaBranchAndBound(pecas, tabela, custo_h, salvar_solucao(placas_h), estatisticas=estatisticas)
+        placas_iniciais = [Placa(0, modo)]
+        # Inicia passando TODAS as peças como "restantes"
+        with estatisticas.fase("busca"):
+            busca.explorar(list(pecas), placas_iniciais)
+        with estatisticas.fase("reconstrucao"):
+            placas = busca.melhor_solucao.placas()
     
     tempo = time.time() - inicio
-    print("Total de nós explorados", total_nos)
-    return melhor_custo, melhor_solucao, tempo
+    print("Total de nós explorados", busca.total_nos)
+    print(f"Tabela de transposição: {tabela.acertos} acertos, {tabela.falhas} falhas, {tabela.remocoes} remoções")
+    return busca.melhor_custo, placas, tempo, estatisticas
+
+#BRANCH AND BOUND PARALELO: os primeiros níveis da árvore viram tarefas para os processos, que dividem entre si o melhor custo encontrado
+tabela_trabalhador = None #tabela de transposição de cada processo, reaproveitada entre as tarefas
+
+def explorar_tarefa(pecas, prefixo, modo, orcamento_nos): #roda o branch and bound abaixo do prefixo; se passar do orçamento, devolve os filhos que faltam como novas tarefas
+    global tabela_trabalhador
+    inicio = time.time()
+    if tabela_trabalhador is None:
+        tabela_trabalhador = TabelaTransposicao(TAMANHO_TABELA_PADRAO)
+    placas = [Placa(0, modo)]
+    for i in prefixo:
+        tentar_encaixar(placas, pecas[i])
+    restantes = [i for i in range(len(pecas)) if i not in prefixo]
+    busca = BuscaBranchAndBound(pecas, tabela_trabalhador, melhor_custo_compartilhado.value, compartilhado=melhor_custo_compartilhado)
+    busca.orcamento_raiz = orcamento_nos
+    with telemetria.coletar(busca.estatisticas), busca.estatisticas.fase("busca"):
+        busca.explorar([pecas[i] for i in restantes], placas, raiz=True)
+    posicao = {id(pecas[i]): i for i in restantes}
+    novas_tarefas = [prefixo + (posicao[id(p)],) for p in busca.sobras]
+    custo = busca.melhor_custo if busca.melhor_solucao is not None else float('inf')
+    return custo, busca.melhor_solucao, busca.total_nos, os.getpid(), time.time() - inicio, novas_tarefas, busca.estatisticas
+
+def branch_and_bound_paralelo(pecas, trabalhadores=None, modo=MODO_PADRAO, tarefas_por_trabalhador=4, orcamento_nos=2000, estatisticas=None):
+    inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    with telemetria.coletar(estatisticas), estatisticas.fase("heuristica_inicial"):
+        custo_h, placas_h, _, _ = heuristica_best_fit([Peca(p.id, p.altura, p.largura) for p in pecas], modo, estatisticas)
+        melhor_custo = custo_h
+        melhor_solucao = salvar_solucao(placas_h)
+    # Expande os primeiros níveis da árvore até ter tarefas suficientes para todos os processos
+    tarefas = [()]
+    while len(tarefas) < tarefas_por_trabalhador * trabalhadores:
+        expandidas = []
+        for prefixo in tarefas:
+            restantes = [i for i in range(len(pecas)) if i not in prefixo]
+            if not restantes:
+                expandidas.append(prefixo)
+            for k in ramificacoes([pecas[i] for i in restantes]):
+                expandidas.append(prefixo + (restantes[k],))
+        if len(expandidas) == len(tarefas):
+            break
+        tarefas = expandidas
+    valor = multiprocessing.Value('d', melhor_custo)
+    nos_por_trabalhador = {}
+    tempo_por_trabalhador = {}
+    total_tarefas = 0
+    with estatisticas.fase("busca"), ProcessPoolExecutor(max_workers=trabalhadores, initializer=iniciar_trabalhador, initargs=(valor,)) as executor:
+        pendentes = {executor.submit(explorar_tarefa, pecas, prefixo, modo, orcamento_nos) for prefixo in tarefas}
+        while pendentes: # Subárvores grandes voltam divididas em tarefas menores, que vão para os processos que ficaram livres
+            prontas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futura in prontas:
+                custo, solucao, nos, pid, tempo_tarefa, novas_tarefas, estatisticas_tarefa = futura.result()
+                estatisticas.somar(estatisticas_tarefa, "trabalhadores/")
+                total_tarefas += 1
+                nos_por_trabalhador[pid] = nos_por_trabalhador.get(pid, 0) + nos
+                tempo_por_trabalhador[pid] = tempo_por_trabalhador.get(pid, 0) + tempo_tarefa
+                if solucao is not None and custo < melhor_custo:
+                    melhor_custo = custo
+                    melhor_solucao = solucao
+                for prefixo in novas_tarefas:
+                    pendentes.add(executor.submit(explorar_tarefa, pecas, prefixo, modo, orcamento_nos))
+    with telemetria.coletar(estatisticas), estatisticas.fase("reconstrucao"):
+        placas = melhor_solucao.placas()
+    tempo = time.time() - inicio
+    relatorio = {
+        "nos_por_trabalhador": nos_por_trabalhador,
+        "tempo_por_trabalhador": tempo_por_trabalhador,
+        "tarefas": total_tarefas,
+        "total_nos": sum(nos_por_trabalhador.values()),
+    }
+    print(f"Total de nós explorados {relatorio['total_nos']} em {total_tarefas} tarefas")
+    for pid in sorted(nos_por_trabalhador):
+        print(f"  processo {pid}: {nos_por_trabalhador[pid]} nós, {tempo_por_trabalhador[pid]:.4f}s")
+    return melhor_custo, placas, tempo, relatorio, estatisticas
 
-def heuristica_best_fit(pecas):
+#MODO ANYTIME: as buscas exatas param ao fim do prazo ou do número de nós e devolvem o melhor layout encontrado até ali
+class OrcamentoBusca:
+    def __init__(self, limite_tempo=None, limite_nos=None):
+        self.prazo = time.time() + limite_tempo if limite_tempo is not None else None
+        self.limite_nos = limite_nos
+        self.nos = 0
+        self.esgotado = False
+    def consumir(self): #conta um nó e diz se a busca tem que parar
+        if not self.esgotado:
+            if self.limite_nos is not None and self.nos >= self.limite_nos:
+                self.esgotado = True
+            elif self.prazo is not None and time.time() >= self.prazo:
+                self.esgotado = True
+            else:
+                self.nos += 1
+        return self.esgotado
+
+def resolver_anytime(pecas, limite_tempo=None, limite_nos=None, ao_melhorar=None, metodo="branch_and_bound", modo=MODO_PADRAO, estatisticas=None):
+    # Parte da solução da heurística e devolve sempre um layout válido, o limite inferior e o gap de otimalidade.
+    # ao_melhorar(custo, placas, tempo) é chamada para a solução inicial e a cada incumbente melhor.
+    # O prazo conta desde a chamada, incluindo a heurística inicial; ela sempre roda até o fim (é o layout devolvido se o prazo acabar),
+    # então em pedidos grandes o tempo total pode passar do limite_tempo pelo tempo da heurística, e a busca fica só com o que sobrar.
     inicio = time.time()
-    placas = [Placa(0)]
-    for peca in pecas:
-        melhor_placa = None
-        melhor_x = None
-        melhor_y = None
-        melhor_sobra = float('inf')
-        for placa in placas:# Tenta encaixar em todas as placas e posições
-            for y in range(placa.margem, placa.comprimento - placa.margem - peca.altura + 1):
-                for x in range(placa.margem, placa.largura - placa.margem - peca.largura + 1):
-                    pode, _ = disponibilidade_peca(placa, peca, x, y)
-                    if pode:
-                        sobra = (placa.largura - (x + peca.largura)) + (placa.comprimento - (y + peca.altura))
-                        if sobra < melhor_sobra:
-                            melhor_sobra = sobra
-                            melhor_placa = placa
-                            melhor_x = x
-                            melhor_y = y
-        if melhor_placa is not None:
-            colocar_peca(melhor_placa, peca, melhor_x, melhor_y)
+    estatisticas = estatisticas or Estatisticas()
+    orcamento = OrcamentoBusca(limite_tempo, limite_nos)
+    melhor = {}
+
+    def registrar(custo, solucao):
+        melhor["custo"] = custo
+        melhor["solucao"] = solucao
+        if ao_melhorar is not None:
+            ao_melhorar(custo, solucao.placas(), time.time() - inicio)
+
+    if metodo not in ("branch_and_bound", "forca_bruta"):
+        raise ValueError(f"Método exato desconhecido: {metodo}")
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("heuristica_inicial"):
+            custo_h, placas_h, _, _ = heuristica_best_fit([Peca(p.id, p.altura, p.largura) for p in pecas], modo, estatisticas)
+            solucao_h = salvar_solucao(placas_h)
+            registrar(custo_h, solucao_h)
+        if metodo == "branch_and_bound":
+            busca = BuscaBranchAndBound(pecas, TabelaTransposicao(TAMANHO_TABELA_PADRAO), custo_h, solucao_h, estatisticas=estatisticas)
+            busca.orcamento = orcamento
+            busca.ao_melhorar = registrar
+            with estatisticas.fase("busca"):
+                busca.explorar(list(pecas), [Placa(0, modo)])
         else:
-            nova = Placa(len(placas))
-            placas.append(nova)
-            colocar_peca(nova, peca, nova.margem, nova.margem)
+            forca_bruta_prefixo(pecas, (), modo, custo_h, orcamento, registrar, estatisticas)
+        with estatisticas.fase("reconstrucao"):
+            placas = melhor["solucao"].placas()
+    # Todo layout paga o corte de todas as peças, então o limite inferior vem do número mínimo de placas
+    custo_corte = sum(p.perimetro() * 0.01 for p in pecas)
+    limite_inferior = limite_inferior_placas(pecas) * 1000 + custo_corte
+    otimo = not orcamento.esgotado or melhor["custo"] <= limite_inferior + EPSILON_CUSTO
+    if otimo:
+        limite_inferior = melhor["custo"]
+    return {
+        "custo": melhor["custo"],
+        "placas": placas,
+        "limite_inferior": limite_inferior,
+        "gap": (melhor["custo"] - limite_inferior) / melhor["custo"] if melhor["custo"] else 0.0,
+        "otimo": otimo,
+        "nos": orcamento.nos,
+        "tempo": time.time() - inicio,
+        "estatisticas": estatisticas,
+    }
+
+def heuristica_best_fit(pecas, modo=MODO_PADRAO, estatisticas=None):
+    inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    placas = [Placa(0, modo)]
+    with telemetria.coletar(estatisticas), estatisticas.fase("encaixe"):
+        for peca in pecas:
+            melhor_placa = None
+            melhor_x = None
+            melhor_y = None
+            melhor_sobra = float('inf')
+            for placa in placas:# Tenta encaixar em todas as placas e posições
+                posicao = melhor_posicao_livre(placa, peca)
+                if posicao is not None and posicao[0] < melhor_sobra:
+                    melhor_sobra, melhor_x, melhor_y = posicao
+                    melhor_placa = placa
+            if melhor_placa is not None:
+                colocar_peca(melhor_placa, peca, melhor_x, melhor_y)
+            else:
+                nova = Placa(len(placas), modo)
+                placas.append(nova)
+                colocar_peca(nova, peca, nova.margem, nova.margem)
     custo = calcular_custo_total(placas)
     tempo = time.time() - inicio
-    return custo, placas, tempo
+    return custo, placas, tempo, estatisticas
+
+#HEURÍSTICA EM LOTE: o mesmo best fit para vários pedidos de uma vez. As peças das placas abertas de todos os pedidos ficam empilhadas
+#em arrays (placa x peça); a cada passo cada pedido coloca a sua próxima peça, e a máscara de posições livres e a sobra de todas as placas
+#candidatas saem de poucas operações numpy, sem laço Python por placa ou posição. Como no modo pontos, só os cantos candidatos são
+#avaliados (a posição de menor sobra encosta na margem ou em outra peça). O layout de cada pedido é o mesmo da heuristica_best_fit.
+TAMANHO_BLOCO_LOTE = 256 #pedidos resolvidos juntos
+PLACAS_POR_PASSO = 512 #máximo de placas avaliadas por operação numpy
+ELEMENTOS_POR_PASSO = 2**22 #máximo de elementos em cada array temporário da avaliação (placas x (peças + 1)²)
+
+def crescer(vetor, linhas=0, colunas=0, preenchimento=0): #cópia do vetor (1D ou 2D) com linhas/colunas a mais no fim
+    return np.pad(vetor, [(0, linhas), (0, colunas)][:vetor.ndim], constant_values=preenchimento)
+
+def encaixar_bloco(pedidos, estatisticas): #devolve, para cada pedido, a lista (placa, x, y) de cada peça na ordem do pedido
+    modelo = Placa(0, MODO_PONTOS)
+    largura, comprimento, m = modelo.largura, modelo.comprimento, modelo.margem
+    area_util = (largura - 2 * m) * (comprimento - 2 * m)
+    tamanhos = np.array([len(pecas) for pecas in pedidos], dtype=np.int64)
+    alturas = np.zeros((len(pedidos), int(tamanhos.max(initial=0))), dtype=np.int64) #peça t de cada pedido, completadas com 0
+    larguras = np.zeros_like(alturas)
+    for o, pecas in enumerate(pedidos):
+        alturas[o, :len(pecas)] = [p.altura for p in pecas]
+        larguras[o, :len(pecas)] = [p.largura for p in pecas]
+    n_placas = len(pedidos) #cada pedido começa com uma placa vazia, como na heuristica_best_fit
+    capacidade = max(2 * n_placas, 1)
+    area = np.zeros(capacidade, dtype=np.int64) #area_ocupada de cada placa
+    dono = np.zeros(capacidade, dtype=np.int64) #pedido de cada placa
+    dono[:n_placas] = np.arange(n_placas)
+    indice_local = np.zeros(capacidade, dtype=np.int64) #índice da placa dentro do seu pedido
+    abertas = np.ones(len(pedidos), dtype=np.int64) #placas abertas por pedido
+    # Retângulos já colocados em cada placa. As colunas vazias têm tamanho 0 em SEM_PECA: não se sobrepõem a nada e o canto
+    # que geram cai fora da área útil
+    SEM_PECA = -largura - comprimento
+    pecas_x = np.full((capacidade, 8), SEM_PECA, dtype=np.int64)
+    pecas_y = np.full((capacidade, 8), SEM_PECA, dtype=np.int64)
+    pecas_l = np.zeros((capacidade, 8), dtype=np.int64)
+    pecas_a = np.zeros((capacidade, 8), dtype=np.int64)
+    n_pecas = np.zeros(capacidade, dtype=np.int64)
+    posicoes = [[] for _ in pedidos]
+
+    for t in range(alturas.shape[1]):
+        with estatisticas.fase("avaliacao"):
+            ativos = np.flatnonzero(tamanhos > t)
+            a = alturas[ativos, t]
+            l = larguras[ativos, t]
+            area_peca = np.minimum(l, largura - 2 * m) * np.minimum(a, comprimento - 2 * m)
+            posicao_ativo = np.full(len(pedidos), -1)
+            posicao_ativo[ativos] = np.arange(len(ativos))
+            k = posicao_ativo[dono[:n_placas]] #posição em ativos do pedido de cada placa (-1 se o pedido já terminou)
+            do_passo = k >= 0
+            estatisticas.encaixes_tentados += int(do_passo.sum())
+            candidatas = np.flatnonzero(do_passo & (area[:n_placas] + area_peca[np.where(do_passo, k, 0)] <= area_util)) #mesmo filtro de sem_espaco
+            sobras = np.full(len(candidatas), -1)
+            xs_escolhidos = np.zeros(len(candidatas), dtype=np.int64)
+            ys_escolhidos = np.zeros(len(candidatas), dtype=np.int64)
+            custo = (n_pecas[candidatas] + 1) ** 2 #elementos de conflitos/pontos por placa (cruza_x/cruza_y têm (nb + 1) * nb)
+            inicio_passo = 0
+            while inicio_passo < len(candidatas):
+                # Quantas placas cabem no passo: o tamanho dos temporários vem da placa com mais peças do passo, não só do número de placas
+                pior = np.maximum.accumulate(custo[inicio_passo:inicio_passo + PLACAS_POR_PASSO])
+                quantas = max(1, int(np.count_nonzero(pior * np.arange(1, len(pior) + 1) <= ELEMENTOS_POR_PASSO)))
+                c = candidatas[inicio_passo:inicio_passo + quantas]
+                kc = k[c]
+                ac, lc = a[kc][:, None], l[kc][:, None]
+                nb = int(n_pecas[c].max())
+                px, py, pl, pa = pecas_x[c, :nb], pecas_y[c, :nb], pecas_l[c, :nb], pecas_a[c, :nb]
+                # Cantos candidatos (xs_fim/ys_fim do modo pontos: a margem e o x/y de cada peça), em ordem crescente; os que ficam
+                # fora da área útil vão para o fim com o valor do tamanho da placa
+                bordas_x = np.concatenate((np.full((len(c), 1), largura - m), px), axis=1) - lc
+                bordas_y = np.concatenate((np.full((len(c), 1), comprimento - m), py), axis=1) - ac
+                xs = np.sort(np.where(bordas_x >= m, bordas_x, largura), axis=1)
+                ys = np.sort(np.where(bordas_y >= m, bordas_y, comprimento), axis=1)
+                # Dois retângulos se sobrepõem quando se sobrepõem nos dois eixos: conflitos[y][x] = peças que cruzam a faixa
+                # horizontal do y e a vertical do x, contadas por um produto de matrizes em todas as placas de uma vez
+                cruza_x = (xs[:, :, None] < (px + pl)[:, None, :]) & (px[:, None, :] < xs[:, :, None] + lc[:, :, None])
+                cruza_y = (ys[:, :, None] < (py + pa)[:, None, :]) & (py[:, None, :] < ys[:, :, None] + ac[:, :, None])
+                conflitos = np.matmul(cruza_y.astype(np.float32), cruza_x.astype(np.float32).transpose(0, 2, 1))
+                ys_validos = ys < comprimento
+                xs_validos = xs < largura
+                livres = (conflitos == 0) & ys_validos[:, :, None] & xs_validos[:, None, :]
+                validas = int((ys_validos.sum(axis=1) * xs_validos.sum(axis=1)).sum())
+                estatisticas.posicoes_testadas += validas
+                estatisticas.celulas_varridas += validas * nb
+                pontos = np.where(livres, ys[:, :, None] + xs[:, None, :], -1).reshape(len(c), -1)
+                melhor = pontos.argmax(axis=1) #menor sobra = maior x + y, empate fica com a primeira na ordem de varredura
+                linha = np.arange(len(c))
+                y = ys[linha, melhor // xs.shape[1]]
+                x = xs[linha, melhor % xs.shape[1]]
+                fatia = slice(inicio_passo, inicio_passo + len(c))
+                sobras[fatia] = np.where(pontos[linha, melhor] >= 0, (largura - (x + lc[:, 0])) + (comprimento - (y + ac[:, 0])), -1)
+                xs_escolhidos[fatia] = x
+                ys_escolhidos[fatia] = y
+                inicio_passo += quantas
+
+        with estatisticas.fase("colocacao"):
+            # Para cada pedido, a placa de menor sobra; empate fica com a aberta primeiro, como no laço da heuristica_best_fit
+            escolha = np.full(len(ativos), -1)
+            x_peca = np.full(len(ativos), m)
+            y_peca = np.full(len(ativos), m)
+            com_posicao = np.flatnonzero(sobras >= 0)
+            if len(com_posicao):
+                ordem = com_posicao[np.lexsort((candidatas[com_posicao], sobras[com_posicao], k[candidatas[com_posicao]]))]
+                pedido_ordenado = k[candidatas[ordem]]
+                primeiras = ordem[np.r_[True, pedido_ordenado[1:] != pedido_ordenado[:-1]]]
+                pedido_escolhido = k[candidatas[primeiras]]
+                escolha[pedido_escolhido] = candidatas[primeiras]
+                x_peca[pedido_escolhido] = xs_escolhidos[primeiras]
+                y_peca[pedido_escolhido] = ys_escolhidos[primeiras]
+            novas = np.flatnonzero(escolha < 0) #sem posição em nenhuma placa: abre uma nova e coloca na margem
+            if n_placas + len(novas) > capacidade:
+                extra = max(capacidade, n_placas + len(novas) - capacidade)
+                area, dono, indice_local, n_pecas = (crescer(v, extra) for v in (area, dono, indice_local, n_pecas))
+                pecas_x, pecas_y = (crescer(v, extra, preenchimento=SEM_PECA) for v in (pecas_x, pecas_y))
+                pecas_l, pecas_a = (crescer(v, extra) for v in (pecas_l, pecas_a))
+                capacidade += extra
+            escolha[novas] = n_placas + np.arange(len(novas))
+            dono[escolha[novas]] = ativos[novas]
+            indice_local[escolha[novas]] = abertas[ativos[novas]]
+            abertas[ativos[novas]] += 1
+            n_placas += len(novas)
+            if int(n_pecas[escolha].max()) == pecas_x.shape[1]:
+                colunas = pecas_x.shape[1]
+                pecas_x, pecas_y = (crescer(v, colunas=colunas, preenchimento=SEM_PECA) for v in (pecas_x, pecas_y))
+                pecas_l, pecas_a = (crescer(v, colunas=colunas) for v in (pecas_l, pecas_a))
+            coluna = n_pecas[escolha]
+            pecas_x[escolha, coluna] = x_peca
+            pecas_y[escolha, coluna] = y_peca
+            pecas_l[escolha, coluna] = l
+            pecas_a[escolha, coluna] = a
+            n_pecas[escolha] += 1
+            area[escolha] += area_peca
+            for o, placa, x, y in zip(ativos.tolist(), indice_local[escolha].tolist(), x_peca.tolist(), y_peca.tolist()):
+                posicoes[o].append((placa, x, y))
+    return posicoes
+
+def heuristica_best_fit_lote(pedidos, modo=MODO_PADRAO, pedidos_por_bloco=TAMANHO_BLOCO_LOTE, estatisticas=None): #pedidos: listas de peças, resolvidas em blocos de pedidos_por_bloco
+    if np is None:
+        raise ImportError("A heurística em lote precisa do pacote numpy instalado")
+    inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    resultados = []
+    with telemetria.coletar(estatisticas):
+        for b in range(0, len(pedidos), pedidos_por_bloco):
+            bloco = pedidos[b:b + pedidos_por_bloco]
+            for pecas, posicoes in zip(bloco, encaixar_bloco(bloco, estatisticas)):
+                with estatisticas.fase("montagem"): #placas no modo pedido, montadas na ordem de colocação (custo_corte soma igual ao da heuristica_best_fit)
+                    placas = [Placa(0, modo)]
+                    for peca, (indice, x, y) in zip(pecas, posicoes):
+                        if indice == len(placas):
+                            placas.append(Placa(indice, modo))
+                        colocar_peca(placas[indice], peca, x, y)
+                resultados.append((calcular_custo_total(placas), placas))
+    tempo = time.time() - inicio
+    total = sum(len(pecas) for pecas in pedidos)
+    return {
+        "resultados": resultados, #(custo, placas) de cada pedido, na ordem recebida
+        "tempo": tempo,
+        "pecas": total,
+        "pecas_por_segundo": total / tempo if tempo > 0 else float('inf'),
+        "estatisticas": estatisticas,
+    }
+
+#METAHEURÍSTICA: recozimento simulado sobre a ordem das peças, decodificada pelo encaixe de tentar_encaixar
+#Cada movimento só mexe na ordem a partir de uma posição i: os encaixes de i em diante são desfeitos e refeitos, o prefixo continua montado.
+#O tamanho do trecho refeito é sorteado em escala logarítmica (quase sempre poucas peças do fim, às vezes a ordem toda), e um movimento
+#rejeitado volta as peças para as posições guardadas, sem procurar encaixe de novo.
+def recozimento_simulado(pecas, limite_tempo=None, max_iteracoes=20000, semente=0, temperatura_inicial=0.3, resfriamento=0.9995, modo=MODO_PONTOS, estatisticas=None):
+    # Determinístico para a mesma semente e max_iteracoes; com limite_tempo a trajetória é a mesma, só o ponto de parada varia
+    inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    rng = random.Random(semente)
+    ordem = sorted((Peca(p.id, p.altura, p.largura) for p in pecas), key=lambda p: p.altura * p.largura, reverse=True) # Começa pela ordem decrescente de área
+    n = len(ordem)
+    placas = [Placa(0, modo)]
+    placas_antes = [] # Quantas placas existiam antes de cada encaixe, para desfazer na ordem inversa
+    area_util = (placas[0].largura - 2 * placas[0].margem) * (placas[0].comprimento - 2 * placas[0].margem)
+
+    def encaixar_desde(i):
+        for k in range(i, n):
+            placas_antes.append(len(placas))
+            tentar_encaixar(placas, ordem[k])
+
+    def desfazer_desde(i):
+        for k in range(n - 1, i - 1, -1):
+            desfazer_encaixe(placas, ordem[k], placas_antes.pop())
+
+    def guardar_desde(i): # Posição de cada encaixe de i em diante, para restaurar_encaixes refazer sem busca
+        return [(ordem[k], ordem[k].placa, ordem[k].x, ordem[k].y) for k in range(i, n)], placas_antes[i:]
+
+    def restaurar_encaixes(guardados):
+        encaixes, antes = guardados
+        for peca, indice, x, y in encaixes:
+            if indice == len(placas):
+                placas.append(Placa(indice, modo))
+            colocar_peca(placas[indice], peca, x, y)
+        placas_antes.extend(antes)
+
+    def energia(): # Menos placas primeiro; no empate, quanto mais vazia a placa menos ocupada, mais perto de ser eliminada
+        return len(placas) + min(placa.area_ocupada for placa in placas) / area_util
+
+    def mover(i, j, troca): # Troca as peças i e j, ou leva a peça j para a posição i
+        if troca:
+            ordem[i], ordem[j] = ordem[j], ordem[i]
+        else:
+            ordem.insert(i, ordem.pop(j))
+
+    def desfazer_movimento(i, j, troca):
+        if troca:
+            ordem[i], ordem[j] = ordem[j], ordem[i]
+        else:
+            ordem.insert(j, ordem.pop(i))
+
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("solucao_inicial"):
+            encaixar_desde(0)
+            atual = energia()
+            melhor_energia = atual
+            melhor_solucao = salvar_solucao(placas)
+        temperatura = temperatura_inicial
+        iteracao = 0
+        with estatisticas.fase("busca"):
+            while n > 1 and iteracao < max_iteracoes:
+                if limite_tempo is not None and time.time() - inicio >= limite_tempo:
+                    break
+                iteracao += 1
+                estatisticas.nos += 1
+                if rng.random() < 0.5: # Movimento qualquer perto do fim: trecho refeito de 2 a n peças, em escala logarítmica
+                    i = n - max(2, int(n ** rng.random()))
+                    j = rng.randrange(i + 1, n)
+                    troca = rng.random() < 0.5
+                else: # Adianta uma peça da placa mais vazia, a que a energia quer eliminar
+                    mais_vazia = min(placas, key=lambda placa: placa.area_ocupada)
+                    j = ordem.index(rng.choice(mais_vazia.pecas))
+                    if j == 0:
+                        continue
+                    i = j - max(1, int(j ** rng.random()))
+                    troca = False
+                guardados = guardar_desde(i)
+                desfazer_desde(i)
+                mover(i, j, troca)
+                encaixar_desde(i)
+                nova = energia()
+                if nova <= atual or rng.random() < math.exp((atual - nova) / temperatura):
+                    atual = nova
+                    if nova < melhor_energia:
+                        melhor_energia = nova
+                        melhor_solucao = salvar_solucao(placas)
+                else:
+                    estatisticas.podar("movimento_rejeitado")
+                    desfazer_desde(i)
+                    desfazer_movimento(i, j, troca)
+                    restaurar_encaixes(guardados)
+                temperatura *= resfriamento
+        custo = melhor_solucao.custo()
+        with estatisticas.fase("reconstrucao"):
+            placas = melhor_solucao.placas()
+    tempo = time.time() - inicio
+    return custo, placas, tempo, estatisticas
 
 #GERADOR DA INTERFACE DO PROGRAMA
 def desenhar_solucao(placas, titulo="Solução"):
+    import matplotlib.pyplot as plt #importado só quando há algo para desenhar, para não pesar nas execuções sem interface
+    import matplotlib.patches as patches
     n_placas = len(placas)
     fig, axes = plt.subplots(1, n_placas, figsize=(8 * n_placas, 8))
     if n_placas == 1:
@@ -246,33 +1046,59 @@ def desenhar_solucao(placas, titulo="Solução"):
     plt.show()
 
 #MAIN
-def main():
-    pecas = ler_entrada("entrada1.txt")
+LIMITE_FORCA_BRUTA = 8 #maior quantidade de peças para qual os algoritmos exatos rodam em tempo razoável
+LIMITE_BRANCH_AND_BOUND = 12
+LIMITE_TEMPO_ANYTIME = 10 #segundos de branch and bound com prazo quando há peças demais para a busca completa
+LIMITE_TEMPO_BUSCA_LOCAL = 5
+
+def main(arquivo="entrada1.txt"):
+    pecas = ler_entrada(arquivo)
     print(f"Número de peças: {len(pecas)}")
     #força bruta funcionando apenas para poucos itens <=8
-    if len(pecas) <= 8:
+    if len(pecas) <= LIMITE_FORCA_BRUTA:
         print("FORÇA BRUTA")
-        custo_fb, placas_fb, tempo_fb = forca_bruta(pecas)
+        custo_fb, placas_fb, tempo_fb, estatisticas_fb = forca_bruta(pecas)
         print(f"Custo: R${custo_fb:.2f}")
         print(f"Tempo: {tempo_fb:.4f}s")
+        print(estatisticas_fb.resumo())
         print(f"Placas usadas: {len(placas_fb)}")
         desenhar_solucao(placas_fb, "Solução Força Bruta")
+    else:
+        print("Muitas peças para força bruta!")
 
+    if len(pecas) <= LIMITE_BRANCH_AND_BOUND:
         print("BRANCH AND BOUND")
-        custo_bb, placas_bb, tempo_bb = branch_and_bound(pecas)
+        custo_bb, placas_bb, tempo_bb, estatisticas_bb = branch_and_bound(pecas)
         print(f"Custo: R${custo_bb:.2f}")
         print(f"Tempo: {tempo_bb:.4f}s")
+        print(estatisticas_bb.resumo())
         print(f"Placas usadas: {len(placas_bb)}")
         desenhar_solucao(placas_bb, "Solução Branch and Bound")
     else:
-        print("Muitas peças para força bruta! Usando apenas heurística.")
+        print(f"BRANCH AND BOUND COM PRAZO DE {LIMITE_TEMPO_ANYTIME}s")
+        resultado = resolver_anytime(pecas, limite_tempo=LIMITE_TEMPO_ANYTIME)
+        print(f"Custo: R${resultado['custo']:.2f}")
+        print(f"Limite inferior: R${resultado['limite_inferior']:.2f} (gap {resultado['gap']:.2%}{', ótimo' if resultado['otimo'] else ''})")
+        print(f"Tempo: {resultado['tempo']:.4f}s")
+        print(resultado['estatisticas'].resumo())
+        print(f"Placas usadas: {len(resultado['placas'])}")
+        desenhar_solucao(resultado['placas'], "Solução Branch and Bound com Prazo")
 
     print("HEURÍSTICA")
-    custo_h, placas_h, tempo_h = heuristica_best_fit(pecas)
+    custo_h, placas_h, tempo_h, estatisticas_h = heuristica_best_fit(pecas)
     print(f"Custo: R${custo_h:.2f}")
     print(f"Tempo: {tempo_h:.4f}s")
+    print(estatisticas_h.resumo())
     print(f"Placas usadas: {len(placas_h)}")
     desenhar_solucao(placas_h, "Solução Heurística")
 
+    print("RECOZIMENTO SIMULADO")
+    custo_r, placas_r, tempo_r, estatisticas_r = recozimento_simulado(pecas, limite_tempo=LIMITE_TEMPO_BUSCA_LOCAL)
+    print(f"Custo: R${custo_r:.2f}")
+    print(f"Tempo: {tempo_r:.4f}s")
+    print(estatisticas_r.resumo())
+    print(f"Placas usadas: {len(placas_r)}")
+    desenhar_solucao(placas_r, "Solução Recozimento Simulado")
+
 if __name__ == "__main__":
-    main()
+    main(*sys.argv[1:2])
@@ -0,0 +1,172 @@
+""" Benchmark dos algoritmos de corte (Problema1) e de partição (trabalho2).
+
+Gera instâncias reproduzíveis no mesmo formato dos arquivos entrada*.txt, roda cada algoritmo em um processo separado
+com limite de tempo (uma vez para o tempo e outra, com tracemalloc, para a memória) e grava um CSV com tempo, pico de memória, nós explorados e qualidade em relação ao melhor valor
+conhecido da instância. Rodar em duas versões do código e comparar os CSVs mostra regressões.
+
+Exemplo:
+    python benchmark.py --tamanhos-corte 5 8 10 --tamanhos-particao 10 20 30 --sementes 1 2 --timeout 30 --saida bench.csv """
+
+import argparse
+import contextlib
+import csv
+import importlib
+import io
+import multiprocessing
+import os
+import random
+import time
+import tracemalloc
+
+# (módulo, função, problema) de cada algoritmo medido
+ALGORITMOS = {
+    "forca_bruta": ("Problema1", "forca_bruta", "corte"),
+    "branch_and_bound": ("Problema1", "branch_and_bound", "corte"),
+    "heuristica_best_fit": ("Problema1", "heuristica_best_fit", "corte"),
+    "forca_bruta_particao": ("trabalho2", "forca_bruta_particao", "particao"),
+    "branch_and_bound_particao": ("trabalho2", "branch_and_bound_particao", "particao"),
+    "heuristica_gulosa": ("trabalho2", "heuristica_gulosa", "particao"),
+    "programacao_dinamica_particao": ("trabalho2", "programacao_dinamica_particao", "particao"),
+    "encontro_no_meio_particao": ("trabalho2", "encontro_no_meio_particao", "particao"),
+    "karmarkar_karp_completo": ("trabalho2", "karmarkar_karp_completo", "particao"),
+}
+
+# Faixas de (altura, largura) em cm; "mista" sorteia entre peças pequenas e grandes
+DISTRIBUICOES = {
+    "uniforme": [(10, 280)],
+    "pequenas": [(10, 100)],
+    "grandes": [(140, 280)],
+    "mista": [(10, 100), (140, 280)],
+}
+
+COLUNAS = ["instancia", "problema", "distribuicao", "pecas", "semente", "algoritmo", "status", "valor", "placas",
+           "melhor_conhecido", "gap", "tempo_s", "pico_memoria_kb", "nos", "erro"]
+
+#GERAÇÃO DE INSTÂNCIAS
+def gerar_instancia(caminho, n, semente, distribuicao="uniforme"):
+    rng = random.Random(f"{distribuicao}-{n}-{semente}") # Mesma instância para os mesmos parâmetros em qualquer máquina
+    faixas = DISTRIBUICOES[distribuicao]
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(f"{n}\n")
+        for _ in range(n):
+            minimo, maximo = rng.choice(faixas)
+            f.write(f"{rng.randint(minimo, maximo)} {rng.randint(minimo, maximo)}\n")
+    return caminho
+
+#EXECUÇÃO DE UM ALGORITMO (em processo separado)
+def executar(nome, arquivo, conexao):
+    # Duas execuções: a primeira mede o tempo sem o tracemalloc (que deixa o Python bem mais lento), a segunda só o pico de memória
+    try:
+        modulo, funcao, problema = ALGORITMOS[nome]
+        modulo = importlib.import_module(modulo)
+        pecas = modulo.ler_entrada(arquivo)
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = getattr(modulo, funcao)(pecas)
+        tempo = time.perf_counter() - inicio
+        conexao.send({
+            "status": "ok",
+            "valor": resultado[0], # custo (corte) ou diferença de peso (partição)
+            "placas": len(resultado[1]) if problema == "corte" else "",
+            "tempo_s": tempo,
+            "nos": resultado[-1].nos, # Estatisticas é sempre o último item do resultado
+        })
+        pecas = modulo.ler_entrada(arquivo) # Peças novas: os algoritmos de corte alteram as posições das recebidas
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            getattr(modulo, funcao)(pecas)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        conexao.send({"pico_memoria_kb": pico / 1024})
+    except Exception as erro: # Vira uma linha com status "erro" em vez de derrubar o benchmark
+        conexao.send({"status": "erro", "erro": f"{type(erro).__name__}: {erro}"})
+
+def receber_ate(receber, prazo): #próxima mensagem do processo, ou None se o prazo acabar ou o processo morrer sem enviar
+    try:
+        if receber.poll(max(0.0, prazo - time.perf_counter())):
+            return receber.recv()
+    except EOFError:
+        pass
+    return None
+
+def medir(nome, arquivo, timeout):
+    receber, enviar = multiprocessing.Pipe(duplex=False)
+    processo = multiprocessing.Process(target=executar, args=(nome, arquivo, enviar))
+    prazo = time.perf_counter() + timeout
+    processo.start()
+    enviar.close()
+    medida = receber_ate(receber, prazo)
+    if medida is None:
+        vivo = processo.is_alive()
+        medida = {"status": "timeout" if vivo else "erro", "tempo_s": timeout if vivo else ""}
+    elif medida["status"] == "ok": # O pico de memória vem da segunda execução, com um prazo igual ao da primeira
+        memoria = receber_ate(receber, prazo + timeout)
+        if memoria is not None and "pico_memoria_kb" in memoria:
+            medida.update(memoria)
+    processo.join(0 if processo.is_alive() else None)
+    if processo.is_alive():
+        processo.terminate()
+        processo.join()
+    return medida
+
+#MONTAGEM DO RELATÓRIO
+def preencher_qualidade(linhas): #melhor valor conhecido = menor valor entre os algoritmos que terminaram na mesma instância
+    melhores = {}
+    for linha in linhas:
+        if linha["status"] == "ok":
+            melhores[linha["instancia"]] = min(melhores.get(linha["instancia"], float("inf")), linha["valor"])
+    for linha in linhas:
+        melhor = melhores.get(linha["instancia"])
+        linha["melhor_conhecido"] = melhor if melhor is not None else ""
+        if linha["status"] == "ok":
+            if melhor: #gap sempre relativo ao melhor conhecido
+                linha["gap"] = (linha["valor"] - melhor) / melhor
+            else: #melhor = 0 (partição perfeita): quem também chegou a 0 tem gap 0, qualquer outro valor fica infinitamente longe
+                linha["gap"] = 0.0 if linha["valor"] == 0 else float("inf")
+
+def imprimir_tabela(linhas):
+    campos = ["instancia", "algoritmo", "status", "valor", "gap", "tempo_s", "pico_memoria_kb", "nos"]
+    def formatar(valor):
+        return f"{valor:.4f}" if isinstance(valor, float) else str(valor)
+    tabela = [campos] + [[formatar(linha.get(c, "")) for c in campos] for linha in linhas]
+    larguras = [max(len(l[i]) for l in tabela) for i in range(len(campos))]
+    for l in tabela:
+        print("  ".join(v.ljust(larguras[i]) for i, v in enumerate(l)))
+
+#MAIN
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede os algoritmos de corte e partição em instâncias geradas.")
+    parser.add_argument("--tamanhos-corte", type=int, nargs="*", default=[5, 7, 9])
+    parser.add_argument("--tamanhos-particao", type=int, nargs="*", default=[10, 20, 25])
+    parser.add_argument("--distribuicoes", nargs="+", default=["uniforme"], choices=list(DISTRIBUICOES))
+    parser.add_argument("--sementes", type=int, nargs="+", default=[1])
+    parser.add_argument("--algoritmos", nargs="+", default=list(ALGORITMOS), choices=list(ALGORITMOS))
+    parser.add_argument("--timeout", type=float, default=60, help="segundos por execução (a de tempo e, depois, a de memória)")
+    parser.add_argument("--pasta", default="instancias_benchmark", help="onde gravar as instâncias geradas")
+    parser.add_argument("--saida", default="benchmark.csv")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.pasta, exist_ok=True)
+    linhas = []
+    for problema, tamanhos in (("corte", args.tamanhos_corte), ("particao", args.tamanhos_particao)):
+        algoritmos = [a for a in args.algoritmos if ALGORITMOS[a][2] == problema]
+        for distribuicao in args.distribuicoes:
+            for n in tamanhos:
+                for semente in args.sementes:
+                    instancia = f"{problema}_{distribuicao}_{n}_{semente}"
+                    arquivo = gerar_instancia(os.path.join(args.pasta, instancia + ".txt"), n, semente, distribuicao)
+                    for nome in algoritmos:
+                        linha = {"instancia": instancia, "problema": problema, "distribuicao": distribuicao, "pecas": n,
+                                 "semente": semente, "algoritmo": nome}
+                        linha.update(medir(nome, arquivo, args.timeout))
+                        linhas.append(linha)
+    preencher_qualidade(linhas)
+    with open(args.saida, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUNAS, extrasaction="ignore")
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    imprimir_tabela(linhas)
+    print(f"Resultados gravados em {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+""" Cache persistente de resultados (SQLite), para não recalcular pedidos com a mesma lista de peças.
+
+A chave é a forma canônica da instância: dimensões das peças em ordem crescente, tamanho e margem da placa (no corte),
+algoritmo e parâmetros que mudam o resultado. Em uma falha o algoritmo resolve as peças já na ordem canônica, então o
+resultado guardado serve para qualquer ordem de entrada; os ids são traduzidos de volta para os do pedido que consultou.
+Algoritmos cujo resultado depende da ordem das peças (heurísticas de encaixe, buscas cortadas por prazo) passam
+depende_da_ordem=True: a chave leva as dimensões na ordem do pedido e o algoritmo resolve nessa mesma ordem, então o
+cache devolve exatamente o que a execução sem cache devolveria. Em um acerto o "tempo" guardado vira "tempo_original".
+
+O cache guarda no máximo `capacidade` resultados e descarta o usado há mais tempo (LRU). Exemplo:
+    cache = CacheResultados("cache_resultados.sqlite")
+    resultado = cache.resolver("particao", "branch_and_bound", pecas, calcular)
+    print(cache.acertos, cache.falhas, cache.remocoes) """
+
+import hashlib
+import json
+import sqlite3
+
+CAPACIDADE_PADRAO = 10000
+
+#FORMA CANÔNICA
+def ordem_canonica(pecas): #índices das peças ordenados por (altura, largura); peças iguais mantêm a ordem de entrada
+    return sorted(range(len(pecas)), key=lambda i: (pecas[i].altura, pecas[i].largura))
+
+def ordem_da_chave(pecas, depende_da_ordem=False): #ordem em que as peças entram na chave e são resolvidas
+    return list(range(len(pecas))) if depende_da_ordem else ordem_canonica(pecas)
+
+def chave_instancia(problema, algoritmo, pecas, ordem, parametros=None):
+    forma = {
+        "problema": problema,
+        "algoritmo": algoritmo,
+        "dimensoes": [[pecas[i].altura, pecas[i].largura] for i in ordem],
+        "parametros": parametros or {},
+    }
+    return hashlib.sha256(json.dumps(forma, sort_keys=True).encode()).hexdigest()
+
+def traduzir_ids(problema, valor, ids): #troca os ids canônicos (0..n-1) pelos ids do pedido
+    valor = dict(valor)
+    if problema == "corte":
+        valor["layout"] = [[[ids[p[0]]] + p[1:] for p in placa] for placa in valor["layout"]]
+    else:
+        valor["porao_1"] = [ids[i] for i in valor["porao_1"]]
+        valor["porao_2"] = [ids[i] for i in valor["porao_2"]]
+    return valor
+
+def marcar_acerto(valor): #o tempo guardado é o da execução que calculou o resultado, não o desta consulta
+    valor = dict(valor)
+    if "tempo" in valor:
+        valor["tempo_original"] = valor.pop("tempo")
+    return valor
+
+#CACHE
+class CacheResultados:
+    def __init__(self, caminho, capacidade=CAPACIDADE_PADRAO):
+        self.capacidade = capacidade
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.conexao = sqlite3.connect(caminho, timeout=30) # Vários processos do lote podem usar o mesmo arquivo
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("CREATE TABLE IF NOT EXISTS resultados (chave TEXT PRIMARY KEY, valor TEXT NOT NULL, usado INTEGER NOT NULL)")
+        self.conexao.execute("CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado)")
+        self.conexao.commit()
+
+    def proximo_uso(self): #contador crescente que marca o último acesso de cada resultado
+        return (self.conexao.execute("SELECT MAX(usado) FROM resultados").fetchone()[0] or 0) + 1
+
+    def consultar(self, chave):
+        linha = self.conexao.execute("SELECT valor FROM resultados WHERE chave = ?", (chave,)).fetchone()
+        if linha is None:
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        with self.conexao:
+            self.conexao.execute("UPDATE resultados SET usado = ? WHERE chave = ?", (self.proximo_uso(), chave))
+        return json.loads(linha[0])
+
+    def registrar(self, chave, valor):
+        with self.conexao:
+            self.conexao.execute("INSERT OR REPLACE INTO resultados (chave, valor, usado) VALUES (?, ?, ?)",
+                                 (chave, json.dumps(valor), self.proximo_uso()))
+            excesso = self.conexao.execute("SELECT COUNT(*) FROM resultados").fetchone()[0] - self.capacidade
+            if excesso > 0:
+                self.conexao.execute("DELETE FROM resultados WHERE chave IN (SELECT chave FROM resultados ORDER BY usado LIMIT ?)", (excesso,))
+                self.remocoes += excesso
+
+    def resolver(self, problema, algoritmo, pecas, calcular, parametros=None, depende_da_ordem=False):
+        # calcular(pecas_canonicas) recebe as peças na ordem canônica (ou na do pedido, com depende_da_ordem), com ids 0..n-1, e
+        # devolve o resultado em dicionário com "layout" (corte) ou "porao_1"/"porao_2" (partição).
+        # Devolve (resultado com os ids do pedido, True se veio do cache)
+        ordem = ordem_da_chave(pecas, depende_da_ordem)
+        ids = [pecas[i].id for i in ordem]
+        chave = chave_instancia(problema, algoritmo, pecas, ordem, parametros)
+        valor = self.consultar(chave)
+        acerto = valor is not None
+        if not acerto:
+            tipo = type(pecas[0]) if pecas else None
+            valor = calcular([tipo(k, pecas[i].altura, pecas[i].largura) for k, i in enumerate(ordem)])
+            self.registrar(chave, valor)
+        else:
+            valor = marcar_acerto(valor)
+        return traduzir_ids(problema, valor, ids), acerto
+
+    def __len__(self):
+        return self.conexao.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+    def fechar(self):
+        self.conexao.close()
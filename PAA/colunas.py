@@ -0,0 +1,155 @@
+""" Leitura das instâncias direto em colunas (alturas e larguras), sem um objeto por peça.
+
+Lê o formato texto de sempre (primeira linha com a quantidade de peças, depois "altura largura" por linha) e um formato
+binário compacto para instâncias grandes já convertidas, aberto com memmap. O texto é lido inteiro para a memória (com
+alguns vetores auxiliares de um inteiro por campo); só o binário é lido sob demanda:
+    8 bytes  "PAACOL1\\0"
+    8 bytes  número de peças n (inteiro sem sinal, little-endian)
+    4n bytes alturas (int32 little-endian)
+    4n bytes larguras (int32 little-endian)
+
+Conversão de um arquivo texto:
+    python colunas.py pedido.txt pedido.bin
+
+Com numpy as colunas são arrays numpy; sem ele, array.array. """
+
+import sys
+import warnings
+from array import array
+try:
+    import numpy as np
+except ImportError: #sem numpy as colunas ficam em array.array
+    np = None
+
+MAGICO = b"PAACOL1\0"
+TAMANHO_CABECALHO = 16
+
+class Colunas:
+    __slots__ = ("alturas", "larguras")
+    def __init__(self, alturas, larguras):
+        self.alturas = alturas
+        self.larguras = larguras
+    def __len__(self):
+        return len(self.alturas)
+    @property
+    def pesos(self): #peso = área, em inteiros de 64 bits para não estourar
+        if np is not None and isinstance(self.alturas, np.ndarray):
+            return self.alturas.astype(np.int64) * self.larguras
+        return array('q', (a * l for a, l in zip(self.alturas, self.larguras)))
+
+def vetor_indices(indices): #lista de índices no mesmo tipo das colunas
+    if np is not None:
+        return np.array(indices, dtype=np.int64)
+    return array('q', indices)
+
+#LEITURA
+def eh_binario(arquivo):
+    with open(arquivo, "rb") as f:
+        return f.read(len(MAGICO)) == MAGICO
+
+def ler_colunas(arquivo):
+    if eh_binario(arquivo):
+        return ler_binario(arquivo)
+    if np is not None:
+        return ler_texto_numpy(arquivo)
+    return ler_texto(arquivo)
+
+def ler_texto_numpy(arquivo): #valida a estrutura das linhas com numpy e converte o texto direto para inteiros, sem guardar as linhas
+    # Mesmas regras do ler_entrada original: linhas em branco são puladas, a primeira tem só a quantidade n, as n seguintes têm
+    # exatamente "altura largura" e o que vier depois delas é ignorado
+    with open(arquivo, "rb") as f:
+        bruto = f.read()
+    caracteres = np.frombuffer(bruto, dtype=np.uint8)
+    espaco = (caracteres == ord(" ")) | ((caracteres >= ord("\t")) & (caracteres <= ord("\r"))) # Mesmos separadores do split(): " \t\n\v\f\r"
+    inicios = np.flatnonzero(~espaco & np.concatenate(([True], espaco[:-1]))) # Primeiro caractere de cada campo
+    if not inicios.size: # Arquivo vazio ou só com espaços
+        return Colunas(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32))
+    tamanho = int(espaco[inicios[0]:].argmax()) or len(bruto) - inicios[0] # argmax 0: o primeiro campo vai até o fim do arquivo
+    n = int(bruto[inicios[0]:inicios[0] + tamanho])
+    del espaco
+    quebras = np.flatnonzero(caracteres == ord("\n"))
+    linha_do_campo = np.searchsorted(quebras, inicios) # Linha (contando as em branco) de cada campo
+    del inicios
+    mudancas = np.flatnonzero(linha_do_campo[1:] != linha_do_campo[:-1]) + 1
+    linhas = linha_do_campo[np.concatenate(([0], mudancas))] # Linhas não vazias, em ordem
+    campos = np.diff(np.concatenate(([0], mudancas, [linha_do_campo.size]))) # Campos em cada uma
+    if campos[0] != 1:
+        raise ValueError(f"{arquivo}: a linha {linhas[0] + 1} deve ter só a quantidade de peças")
+    if linhas.size < 1 + n:
+        raise ValueError(f"{arquivo}: esperadas {n} peças, encontradas {linhas.size - 1}")
+    erradas = np.flatnonzero(campos[1:1 + n] != 2)
+    if erradas.size:
+        linha = linhas[1 + erradas[0]]
+        raise ValueError(f"{arquivo}: a linha {linha + 1} deve ter altura e largura, tem {campos[1 + erradas[0]]} campos")
+    fim = quebras[linhas[n]] if linhas[n] < quebras.size else len(bruto) # Fim da linha da última peça
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning) # Conversão incompleta (campo que não é inteiro) vira erro
+        try:
+            dados = np.fromstring(bruto[:fim], dtype=np.int64, sep=" ")
+        except (DeprecationWarning, ValueError) as erro:
+            raise ValueError(f"{arquivo}: valor inválido ({erro})") from None
+    if dados.size != 1 + 2 * n:
+        raise ValueError(f"{arquivo}: valor inválido nas linhas das peças")
+    pares = dados[1:].reshape(n, 2)
+    return Colunas(pares[:, 0].astype(np.int32), pares[:, 1].astype(np.int32))
+
+def ler_texto(arquivo): #lê linha a linha, guardando só as colunas
+    alturas = array('i')
+    larguras = array('i')
+    n = None
+    with open(arquivo, "r", encoding="utf-8") as f:
+        for numero, linha in enumerate(f, 1):
+            campos = linha.split()
+            if not campos:
+                continue
+            if n is None:
+                if len(campos) != 1:
+                    raise ValueError(f"{arquivo}: a linha {numero} deve ter só a quantidade de peças")
+                n = int(campos[0])
+                continue
+            if len(alturas) == n:
+                break
+            if len(campos) != 2:
+                raise ValueError(f"{arquivo}: a linha {numero} deve ter altura e largura, tem {len(campos)} campos")
+            alturas.append(int(campos[0]))
+            larguras.append(int(campos[1]))
+    if n is not None and len(alturas) < n:
+        raise ValueError(f"{arquivo}: esperadas {n} peças, encontradas {len(alturas)}")
+    return Colunas(alturas, larguras)
+
+def ler_binario(arquivo):
+    with open(arquivo, "rb") as f:
+        n = int.from_bytes(f.read(TAMANHO_CABECALHO)[len(MAGICO):], "little")
+        if np is not None:
+            if n == 0:
+                return Colunas(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32))
+            dados = np.memmap(arquivo, dtype="<i4", mode="r", offset=TAMANHO_CABECALHO, shape=(2, n)) # Só as páginas usadas são lidas do disco
+            return Colunas(dados[0], dados[1])
+        alturas = array('i')
+        larguras = array('i')
+        alturas.fromfile(f, n)
+        larguras.fromfile(f, n)
+    if sys.byteorder == "big":
+        alturas.byteswap()
+        larguras.byteswap()
+    return Colunas(alturas, larguras)
+
+#ESCRITA
+def salvar_binario(caminho, colunas):
+    with open(caminho, "wb") as f:
+        f.write(MAGICO)
+        f.write(len(colunas).to_bytes(TAMANHO_CABECALHO - len(MAGICO), "little"))
+        for coluna in (colunas.alturas, colunas.larguras):
+            if np is not None:
+                np.asarray(coluna, dtype="<i4").tofile(f)
+            else:
+                valores = array('i', coluna)
+                if sys.byteorder == "big":
+                    valores.byteswap()
+                valores.tofile(f)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python colunas.py entrada.txt saida.bin")
+        sys.exit(1)
+    salvar_binario(sys.argv[2], ler_colunas(sys.argv[1]))
@@ -0,0 +1,267 @@
+""" Execução em lote dos dois problemas (corte de placas e partição dos porões) sem interface gráfica.
+
+Exemplos:
+    python lote.py corte entrada1.txt entrada2.txt --algoritmos heuristica branch_and_bound
+    python lote.py particao pasta_de_pedidos/ --trabalhadores 8 --saida resultados.jsonl
+    ls pedidos/*.txt | python lote.py corte - --limite-tempo 2
+    python lote.py corte pedidos/ --sem-cache
+    python lote.py corte pedidos/ --vetorizado
+
+Cada resultado é uma linha JSON. O matplotlib só é importado com --desenhar. Com --vetorizado a heurística de corte resolve
+todos os arquivos juntos no processo principal (Problema1.heuristica_best_fit_lote), com o mesmo layout. Resultados ficam guardados em
+cache_resultados.sqlite (ver cache_resultados.py): pedidos com as mesmas peças, em qualquer ordem, não são recalculados. """
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import Problema1
+import trabalho2
+from cache_resultados import CAPACIDADE_PADRAO, CacheResultados, chave_instancia, marcar_acerto, ordem_da_chave, traduzir_ids
+
+ALGORITMOS_CORTE = ["heuristica", "branch_and_bound", "forca_bruta", "recozimento"]
+SOLUCIONADORES_PARTICAO = {
+    "heuristica": trabalho2.heuristica_gulosa,
+    "branch_and_bound": trabalho2.branch_and_bound_particao,
+    "forca_bruta": trabalho2.forca_bruta_particao,
+    "programacao_dinamica": trabalho2.programacao_dinamica_particao,
+    "encontro_no_meio": trabalho2.encontro_no_meio_particao,
+    "karmarkar_karp": trabalho2.karmarkar_karp_completo,
+    "exato": trabalho2.particao_exata, # Escolhe sozinho entre branch and bound, programação dinâmica, encontro no meio e Karmarkar–Karp
+}
+ALGORITMOS_PARTICAO = list(SOLUCIONADORES_PARTICAO)
+COM_PRAZO_PARTICAO = {"karmarkar_karp", "exato"} #algoritmos de partição que recebem --limite-tempo
+
+#LEITURA DOS ARQUIVOS
+def listar_arquivos(entradas): #expande pastas (todos os .txt e .bin) e "-" (um caminho por linha na entrada padrão)
+    arquivos = []
+    for entrada in entradas:
+        if entrada == "-":
+            arquivos.extend(linha.strip() for linha in sys.stdin if linha.strip())
+        elif os.path.isdir(entrada):
+            arquivos.extend(sorted(os.path.join(entrada, nome) for nome in os.listdir(entrada) if nome.endswith((".txt", ".bin"))))
+        else:
+            arquivos.append(entrada)
+    return arquivos
+
+#RESOLUÇÃO DE UM ARQUIVO
+cache_trabalhador = None #conexão com o cache de cada processo, aberta na primeira tarefa
+
+def abrir_cache(caminho, capacidade):
+    global cache_trabalhador
+    if cache_trabalhador is None:
+        cache_trabalhador = CacheResultados(caminho, capacidade)
+    return cache_trabalhador
+
+def resolver_corte(arquivo, algoritmo, limite_tempo, cache=None):
+    pecas = Problema1.ler_entrada(arquivo)
+    if cache is None:
+        return calcular_corte(pecas, algoritmo, limite_tempo)
+    parametros = parametros_corte(algoritmo, limite_tempo)
+    resultado, acerto = cache.resolver("corte", algoritmo, pecas, lambda canonicas: calcular_corte(canonicas, algoritmo, limite_tempo), parametros,
+                                       depende_da_ordem_corte(algoritmo, limite_tempo))
+    resultado["cache"] = "acerto" if acerto else "falha"
+    return resultado
+
+def calcular_corte(pecas, algoritmo, limite_tempo):
+    resultado = {"pecas": len(pecas)}
+    if algoritmo in ("branch_and_bound", "forca_bruta"):
+        r = Problema1.resolver_anytime(pecas, limite_tempo=limite_tempo, metodo=algoritmo)
+        custo, placas, tempo, estatisticas = r["custo"], r["placas"], r["tempo"], r["estatisticas"]
+        resultado.update(nos=r["nos"], limite_inferior=r["limite_inferior"], otimo=r["otimo"])
+    elif algoritmo == "heuristica":
+        custo, placas, tempo, estatisticas = Problema1.heuristica_best_fit(pecas)
+    elif algoritmo == "recozimento":
+        custo, placas, tempo, estatisticas = Problema1.recozimento_simulado(pecas, limite_tempo=limite_tempo)
+    else:
+        raise ValueError(f"Algoritmo de corte desconhecido: {algoritmo}")
+    resultado.update(custo=round(custo, 2), placas=len(placas), tempo=tempo, estatisticas=estatisticas.como_dict())
+    resultado["layout"] = [[[p.id, p.x, p.y, p.altura, p.largura] for p in placa.pecas] for placa in placas]
+    return resultado
+
+def depende_da_ordem_corte(algoritmo, limite_tempo): #encaixes gulosos dependem da ordem das peças; as buscas exatas só quando o prazo as corta
+    return algoritmo in ("heuristica", "recozimento") or limite_tempo is not None
+
+def parametros_corte(algoritmo, limite_tempo):
+    placa = Problema1.Placa(0)
+    parametros = {"placa": [placa.largura, placa.comprimento, placa.margem]}
+    if algoritmo != "heuristica": # A heurística não usa o prazo, então o mesmo resultado vale para qualquer --limite-tempo
+        parametros["limite_tempo"] = limite_tempo
+    return parametros
+
+def resolver_corte_vetorizado(arquivos, cache=None): #heurística de corte de todos os arquivos de uma vez; devolve (resultados, peças por segundo ou None se nada foi calculado)
+    resultados = []
+    pendentes = [] # (resultado, peças na ordem em que serão resolvidas, ids do pedido, chave no cache)
+    for arquivo in arquivos:
+        resultado = {"arquivo": arquivo, "problema": "corte", "algoritmo": "heuristica"}
+        resultados.append(resultado)
+        try:
+            pecas = Problema1.ler_entrada(arquivo)
+        except Exception as erro:
+            resultado["erro"] = f"{type(erro).__name__}: {erro}"
+            continue
+        if cache is None:
+            pendentes.append((resultado, pecas, None, None))
+            continue
+        ordem = ordem_da_chave(pecas, depende_da_ordem_corte("heuristica", None)) # Mesma chave do resolver_corte: o cache vale para os dois caminhos
+        ids = [pecas[i].id for i in ordem]
+        chave = chave_instancia("corte", "heuristica", pecas, ordem, parametros_corte("heuristica", None))
+        valor = cache.consultar(chave)
+        if valor is not None:
+            resultado.update(traduzir_ids("corte", marcar_acerto(valor), ids), cache="acerto")
+        else:
+            pendentes.append((resultado, [Problema1.Peca(k, pecas[i].altura, pecas[i].largura) for k, i in enumerate(ordem)], ids, chave))
+    lote = Problema1.heuristica_best_fit_lote([pecas for _, pecas, _, _ in pendentes])
+    for (resultado, pecas, ids, chave), (custo, placas) in zip(pendentes, lote["resultados"]):
+        valor = {
+            "pecas": len(pecas),
+            "custo": round(custo, 2),
+            "placas": len(placas),
+            "tempo": lote["tempo"] * len(pecas) / max(lote["pecas"], 1), # Parte do tempo do lote proporcional às peças do pedido
+            "layout": [[[p.id, p.x, p.y, p.altura, p.largura] for p in placa.pecas] for placa in placas],
+        }
+        if cache is None:
+            resultado.update(valor)
+        else:
+            cache.registrar(chave, valor)
+            resultado.update(traduzir_ids("corte", valor, ids), cache="falha")
+    return resultados, lote["pecas_por_segundo"] if lote["pecas"] else None # Tudo do cache (ou com erro): não há taxa a medir
+
+def resolver_particao(arquivo, algoritmo, limite_tempo, cache=None):
+    pecas = trabalho2.ler_entrada(arquivo)
+    if not pecas:
+        raise ValueError("Erro na leitura ou arquivo vazio")
+    if cache is None:
+        return calcular_particao(pecas, algoritmo, limite_tempo)
+    parametros = {"limite_tempo": limite_tempo} if algoritmo in COM_PRAZO_PARTICAO else None
+    resultado, acerto = cache.resolver("particao", algoritmo, pecas, lambda canonicas: calcular_particao(canonicas, algoritmo, limite_tempo), parametros)
+    resultado["cache"] = "acerto" if acerto else "falha"
+    return resultado
+
+def calcular_particao(pecas, algoritmo, limite_tempo=None):
+    if algoritmo not in SOLUCIONADORES_PARTICAO:
+        raise ValueError(f"Algoritmo de partição desconhecido: {algoritmo}")
+    if algoritmo in COM_PRAZO_PARTICAO:
+        diff, grupo_a, grupo_b, tempo, estatisticas = SOLUCIONADORES_PARTICAO[algoritmo](pecas, limite_tempo=limite_tempo)
+    else:
+        diff, grupo_a, grupo_b, tempo, estatisticas = SOLUCIONADORES_PARTICAO[algoritmo](pecas)
+    return {
+        "pecas": len(pecas),
+        "diferenca": diff,
+        "peso_porao_1": sum(p.peso for p in grupo_a),
+        "peso_porao_2": sum(p.peso for p in grupo_b),
+        "porao_1": [p.id for p in grupo_a],
+        "porao_2": [p.id for p in grupo_b],
+        "tempo": tempo,
+        "estatisticas": estatisticas.como_dict(),
+    }
+
+def resolver_tarefa(tarefa): #roda em um processo do pool; erros viram uma linha com "erro" para não derrubar o lote
+    problema, arquivo, algoritmo, limite_tempo, caminho_cache, capacidade_cache = tarefa
+    inicio = time.time()
+    resultado = {"arquivo": arquivo, "problema": problema, "algoritmo": algoritmo}
+    try:
+        cache = abrir_cache(caminho_cache, capacidade_cache) if caminho_cache is not None else None
+        with contextlib.redirect_stdout(io.StringIO()): # Os algoritmos imprimem contadores; a saída padrão fica só para o JSON
+            if problema == "corte":
+                resultado.update(resolver_corte(arquivo, algoritmo, limite_tempo, cache))
+            else:
+                resultado.update(resolver_particao(arquivo, algoritmo, limite_tempo, cache))
+    except Exception as erro:
+        resultado["erro"] = f"{type(erro).__name__}: {erro}"
+    resultado["tempo_total"] = time.time() - inicio
+    return resultado
+
+#DESENHO (opcional)
+def desenhar_resultado(resultado):
+    if "erro" in resultado:
+        return
+    titulo = f"{os.path.basename(resultado['arquivo'])} - {resultado['algoritmo']}"
+    if resultado["problema"] == "corte":
+        placas = []
+        for indice, pecas_placa in enumerate(resultado["layout"]):
+            placa = Problema1.Placa(indice)
+            for id, x, y, altura, largura in pecas_placa:
+                Problema1.colocar_peca(placa, Problema1.Peca(id, altura, largura), x, y)
+            placas.append(placa)
+        Problema1.desenhar_solucao(placas, titulo)
+    else:
+        pecas = {p.id: p for p in trabalho2.ler_entrada(resultado["arquivo"])}
+        trabalho2.desenhar_particao([pecas[i] for i in resultado["porao_1"]], [pecas[i] for i in resultado["porao_2"]], titulo)
+
+#MAIN
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve vários arquivos de entrada e escreve um resultado JSON por linha.")
+    parser.add_argument("problema", choices=["corte", "particao"])
+    parser.add_argument("entradas", nargs="+", help="arquivos, pastas (todos os .txt e .bin) ou '-' para ler os caminhos da entrada padrão")
+    parser.add_argument("--algoritmos", nargs="+", default=["heuristica"])
+    parser.add_argument("--trabalhadores", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limite-tempo", type=float, default=None, help="segundos por execução dos algoritmos de corte exatos (a heurística inicial deles sempre termina, mesmo passando do prazo), do recozimento e do Karmarkar–Karp completo")
+    parser.add_argument("--saida", default="-", help="arquivo .jsonl de saída ('-' para a saída padrão)")
+    parser.add_argument("--desenhar", action="store_true", help="desenha cada resultado com matplotlib no fim")
+    parser.add_argument("--cache", default="cache_resultados.sqlite", help="arquivo SQLite com os resultados já calculados")
+    parser.add_argument("--tamanho-cache", type=int, default=CAPACIDADE_PADRAO, help="máximo de resultados guardados no cache")
+    parser.add_argument("--sem-cache", action="store_true", help="sempre recalcula, sem consultar nem gravar o cache")
+    parser.add_argument("--vetorizado", action="store_true", help="heurística de corte de todos os arquivos junta, em operações numpy")
+    args = parser.parse_args(argv)
+
+    validos = ALGORITMOS_CORTE if args.problema == "corte" else ALGORITMOS_PARTICAO
+    for algoritmo in args.algoritmos:
+        if algoritmo not in validos:
+            parser.error(f"algoritmo '{algoritmo}' inválido para {args.problema}; opções: {', '.join(validos)}")
+    caminho_cache = None if args.sem_cache else args.cache
+    arquivos = listar_arquivos(args.entradas)
+    vetorizado = args.vetorizado and args.problema == "corte" and "heuristica" in args.algoritmos
+    tarefas = [(args.problema, arquivo, algoritmo, args.limite_tempo, caminho_cache, args.tamanho_cache)
+               for arquivo in arquivos for algoritmo in args.algoritmos if not (vetorizado and algoritmo == "heuristica")]
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    desenhar = []
+    uso_cache = {"acerto": 0, "falha": 0}
+    try:
+        if vetorizado:
+            inicio = time.time()
+            cache = CacheResultados(caminho_cache, args.tamanho_cache) if caminho_cache is not None else None
+            resultados, pecas_por_segundo = resolver_corte_vetorizado(arquivos, cache)
+            if cache is not None:
+                cache.fechar()
+            for resultado in resultados:
+                resultado["tempo_total"] = (time.time() - inicio) / len(resultados)
+                saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+                if "cache" in resultado:
+                    uso_cache[resultado["cache"]] += 1
+                if args.desenhar:
+                    desenhar.append(resultado)
+            saida.flush()
+            if pecas_por_segundo is not None:
+                print(f"Heurística vetorizada: {pecas_por_segundo:.0f} peças por segundo", file=sys.stderr)
+        if args.trabalhadores > 1 and len(tarefas) > 1:
+            executor = ProcessPoolExecutor(max_workers=args.trabalhadores)
+            resultados = executor.map(resolver_tarefa, tarefas, chunksize=max(1, len(tarefas) // (4 * args.trabalhadores)))
+        else:
+            executor = None
+            resultados = map(resolver_tarefa, tarefas)
+        for resultado in resultados:
+            saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            saida.flush()
+            if "cache" in resultado:
+                uso_cache[resultado["cache"]] += 1
+            if args.desenhar:
+                desenhar.append(resultado)
+        if executor is not None:
+            executor.shutdown()
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    if caminho_cache is not None:
+        print(f"Cache: {uso_cache['acerto']} acertos, {uso_cache['falha']} falhas", file=sys.stderr)
+    for resultado in desenhar:
+        desenhar_resultado(resultado)
+
+if __name__ == "__main__":
+    main()
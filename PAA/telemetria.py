@@ -0,0 +1,110 @@
+""" Estatísticas de execução dos algoritmos de corte (Problema1) e de partição (trabalho2).
+
+Todo algoritmo devolve, como último item do resultado, um objeto Estatisticas com os nós expandidos, as podas por motivo,
+as posições e células testadas, os encaixes tentados, as cópias de layout e o tempo de cada fase.
+
+Para ver onde o tempo vai:
+    est = Estatisticas(perfil=True)                      # cProfile durante a execução, em est.perfil
+    est = Estatisticas(amostrador=func, intervalo=0.01)  # func(frame) chamada periodicamente com o quadro em execução
+    custo, placas, tempo, est = Problema1.branch_and_bound(pecas, estatisticas=est)
+    pstats.Stats(est.perfil).sort_stats("cumulative").print_stats(10) """
+
+import cProfile
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+atual = None #estatísticas da execução em andamento neste processo; as funções internas contam nela sem precisar receber o objeto
+
+class Estatisticas:
+    def __init__(self, perfil=False, amostrador=None, intervalo=0.01):
+        self.nos = 0 #nós expandidos (ou permutações/iterações, conforme o algoritmo)
+        self.podas = {} #motivo -> quantidade: "bound", "inviavel", "diferenca_zero", "tabela", "movimento_rejeitado", "prazo", "simetria"
+        self.posicoes_testadas = 0 #posições (x, y) avaliadas para uma peça
+        self.celulas_varridas = 0 #células da matriz (ou entradas da soma de prefixos) lidas nessas avaliações
+        self.encaixes_tentados = 0 #buscas de posição de uma peça em uma placa
+        self.copias = 0 #retratos de layout salvos ou remontados
+        self.tempo_fases = {} #fase -> segundos; fases podem se aninhar (a heurística inicial roda dentro do branch and bound)
+        self.perfil = cProfile.Profile() if perfil else None
+        self.amostrador = amostrador
+        self.intervalo = intervalo
+        self._ativa = 0
+
+    def podar(self, motivo):
+        self.podas[motivo] = self.podas.get(motivo, 0) + 1
+
+    @contextmanager
+    def fase(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempo_fases[nome] = self.tempo_fases.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def somar(self, outra, prefixo=""): #junta as contagens de outra execução (ex.: de um processo trabalhador)
+        self.nos += outra.nos
+        for motivo, quantidade in outra.podas.items():
+            self.podas[motivo] = self.podas.get(motivo, 0) + quantidade
+        self.posicoes_testadas += outra.posicoes_testadas
+        self.celulas_varridas += outra.celulas_varridas
+        self.encaixes_tentados += outra.encaixes_tentados
+        self.copias += outra.copias
+        for nome, segundos in outra.tempo_fases.items():
+            self.tempo_fases[prefixo + nome] = self.tempo_fases.get(prefixo + nome, 0.0) + segundos
+
+    def como_dict(self):
+        return {
+            "nos": self.nos,
+            "podas": dict(self.podas),
+            "posicoes_testadas": self.posicoes_testadas,
+            "celulas_varridas": self.celulas_varridas,
+            "encaixes_tentados": self.encaixes_tentados,
+            "copias": self.copias,
+            "tempo_fases": dict(self.tempo_fases),
+        }
+
+    def resumo(self): #uma linha para imprimir junto com o resultado
+        podas = ", ".join(f"{motivo} {quantidade}" for motivo, quantidade in sorted(self.podas.items())) or "nenhuma"
+        fases = ", ".join(f"{nome} {segundos:.4f}s" for nome, segundos in self.tempo_fases.items())
+        return (f"Nós: {self.nos} | Podas: {podas} | Posições testadas: {self.posicoes_testadas} | Células varridas: {self.celulas_varridas} | "
+                f"Encaixes tentados: {self.encaixes_tentados} | Cópias: {self.copias} | Fases: {fases}")
+
+    def __repr__(self):
+        return f"Estatisticas({self.como_dict()})"
+
+    def __getstate__(self): #volta dos processos trabalhadores só com as contagens
+        estado = self.__dict__.copy()
+        estado.update(perfil=None, amostrador=None, _ativa=0)
+        return estado
+
+#COLETA
+def amostrar(estatisticas, alvo, parar): #thread que chama o amostrador com o quadro atual da thread que está resolvendo
+    while not parar.wait(estatisticas.intervalo):
+        quadro = sys._current_frames().get(alvo)
+        if quadro is not None:
+            estatisticas.amostrador(quadro)
+
+@contextmanager
+def coletar(estatisticas): #torna as estatísticas as atuais; perfil e amostragem só ligam na execução mais externa
+    global atual
+    anterior = atual
+    atual = estatisticas
+    estatisticas._ativa += 1
+    parar = None
+    if estatisticas._ativa == 1:
+        if estatisticas.amostrador is not None:
+            parar = threading.Event()
+            threading.Thread(target=amostrar, args=(estatisticas, threading.get_ident(), parar), daemon=True).start()
+        if estatisticas.perfil is not None:
+            estatisticas.perfil.enable()
+    try:
+        yield estatisticas
+    finally:
+        if estatisticas._ativa == 1:
+            if estatisticas.perfil is not None:
+                estatisticas.perfil.disable()
+            if parar is not None:
+                parar.set()
+        estatisticas._ativa -= 1
+        atual = anterior
@@ -1,8 +1,14 @@
+import bisect
+import heapq
 import itertools
+import math
 import time
+from array import array
 import os
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import sys
+import telemetria
+from colunas import Colunas, ler_colunas, np, vetor_indices
+from telemetria import Estatisticas
 
 # --- Estruturas de Dados ---
 class Peca:
@@ -18,28 +24,50 @@ class Peca:
 
 # --- Leitura de Arquivos ---
 def ler_entrada(arquivo):
-    pecas = []
     if not os.path.exists(arquivo):
         print(f"Erro: Arquivo {arquivo} não encontrado.")
         return []
     
-    with open(arquivo, "r", encoding="utf-8") as f:
-        linhas = [linha.strip() for linha in f if linha.strip() != ""]
-        if not linhas:
-            return []
-        numero_de_pecas = int(linhas[0])
-        for i in range(1, numero_de_pecas + 1):
-            altura, largura = map(int, linhas[i].split())
-            pecas.append(Peca(i - 1, altura, largura))
-    return pecas
+    colunas = ler_colunas(arquivo) # Aceita o formato texto e o binário de colunas.py
+    return [Peca(i, altura, largura) for i, (altura, largura) in enumerate(zip(colunas.alturas.tolist(), colunas.larguras.tolist()))]
+
+# Os algoritmos aceitam uma lista de Peca ou um Colunas (ler_colunas): com Colunas trabalham só com os pesos
+# e devolvem os grupos como vetores de índices, sem criar um objeto por peça
+def extrair_pesos(pecas):
+    if isinstance(pecas, Colunas):
+        return pecas.pesos.tolist()
+    return [p.peso for p in pecas]
+
+def ordenar_por_peso(pecas): #(pesos, índices da peça mais pesada para a mais leve); empates ficam na ordem de entrada
+    if isinstance(pecas, Colunas) and np is not None:
+        pesos = pecas.pesos
+        return pesos.tolist(), np.argsort(-pesos, kind="stable").tolist()
+    pesos = extrair_pesos(pecas)
+    return pesos, sorted(range(len(pesos)), key=pesos.__getitem__, reverse=True)
+
+def montar_grupos(pecas, indices_a, indices_b):
+    if isinstance(pecas, Colunas):
+        return vetor_indices(indices_a), vetor_indices(indices_b)
+    return [pecas[i] for i in indices_a], [pecas[i] for i in indices_b]
+
+def montar_poroes(pecas, indices_por_porao): #montar_grupos para k porões
+    if isinstance(pecas, Colunas):
+        return [vetor_indices(indices) for indices in indices_por_porao]
+    return [[pecas[i] for i in indices] for indices in indices_por_porao]
 
 # --- Interface Gráfica (NOVO) ---
-def desenhar_particao(grupo_a, grupo_b, titulo="Resultado"):
+def desenhar_poroes(poroes, titulo="Resultado"):
     """
-    Desenha as peças empilhadas em dois 'porões' para visualizar o equilíbrio de peso.
+    Desenha as peças empilhadas em cada 'porão' (um painel por porão) para visualizar o equilíbrio de peso.
     """
-    # Cria figura com 2 eixos (lado a lado)
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 6))
+    # matplotlib só é importado quando há algo para desenhar
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+
+    # Até 4 porões por linha; com 2 porões fica igual ao desenho original (lado a lado)
+    por_linha = min(len(poroes), 4)
+    linhas = math.ceil(len(poroes) / por_linha)
+    fig, eixos = plt.subplots(linhas, por_linha, figsize=(5 * por_linha, 6 * linhas), squeeze=False)
     
     # Define cores (mesma paleta da parte 1)
     cores = plt.cm.Set3(range(20))
@@ -82,20 +110,26 @@ def desenhar_particao(grupo_a, grupo_b, titulo="Resultado"):
         # Desenha uma "base" para o porão
         ax.plot([-largura_limite + 10, largura_limite - 10], [0, 0], color='black', linewidth=3)
 
-    desenhar_pilha(ax1, grupo_a, "Porão 1")
-    desenhar_pilha(ax2, grupo_b, "Porão 2")
+    for j, ax in enumerate(eixos.flat):
+        if j < len(poroes):
+            desenhar_pilha(ax, poroes[j], f"Porão {j + 1}")
+        else:
+            ax.axis('off') # Painel sobrando na última linha
     
     plt.suptitle(titulo, fontsize=14, fontweight='bold')
     plt.tight_layout()
     plt.show()
 
+def desenhar_particao(grupo_a, grupo_b, titulo="Resultado"):
+    desenhar_poroes([grupo_a, grupo_b], titulo)
+
 # --- Funções Auxiliares ---
 def calcular_diferenca(grupo_a, grupo_b):
     peso_a = sum(p.peso for p in grupo_a)
     peso_b = sum(p.peso for p in grupo_b)
     return abs(peso_a - peso_b)
 
-def exibir_e_desenhar(metodo, diff, grupo_a, grupo_b, tempo):
+def exibir_e_desenhar(metodo, diff, grupo_a, grupo_b, tempo, estatisticas=None):
     peso_a = sum(p.peso for p in grupo_a)
     peso_b = sum(p.peso for p in grupo_b)
     ids_a = [p.id for p in grupo_a]
@@ -106,118 +140,612 @@ def exibir_e_desenhar(metodo, diff, grupo_a, grupo_b, tempo):
     print(f"Tempo: {tempo:.6f}s")
     print(f"Porão 1 (Peso {peso_a}): Peças {ids_a}")
     print(f"Porão 2 (Peso {peso_b}): Peças {ids_b}")
+    if estatisticas is not None:
+        print(estatisticas.resumo())
     
     # Chama a função gráfica
     desenhar_particao(grupo_a, grupo_b, f"{metodo}\nDiferença: {diff} | Tempo: {tempo:.4f}s")
 
+def exibir_e_desenhar_poroes(metodo, desequilibrio, poroes, tempo, estatisticas=None):
+    print(f"{metodo}")
+    print(f"Diferença entre o porão mais pesado e o mais leve: {desequilibrio}")
+    print(f"Tempo: {tempo:.6f}s")
+    for j, grupo in enumerate(poroes):
+        print(f"Porão {j + 1} (Peso {sum(p.peso for p in grupo)}): Peças {[p.id for p in grupo]}")
+    if estatisticas is not None:
+        print(estatisticas.resumo())
+    
+    desenhar_poroes(poroes, f"{metodo}\nMais pesado - mais leve: {desequilibrio} | Tempo: {tempo:.4f}s")
+
 # --- 6. Força Bruta ---
-def forca_bruta_particao(pecas):
+def forca_bruta_particao(pecas, estatisticas=None):
     inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
     melhor_diff = float('inf')
-    melhor_divisao = ([], [])
+    melhor_combinacao = ()
+    pesos = extrair_pesos(pecas)
+    peso_total = sum(pesos)
     
-    n = len(pecas)
-    # Itera até n//2 + 1 para cobrir todas as combinações únicas de divisão
-    for r in range(n // 2 + 1 + 1): 
-        for combinacao in itertools.combinations(pecas, r):
-            grupo_a = list(combinacao)
-            set_a_ids = {p.id for p in grupo_a}
-            grupo_b = [p for p in pecas if p.id not in set_a_ids]
-            
-            diff = calcular_diferenca(grupo_a, grupo_b)
-            
-            if diff < melhor_diff:
-                melhor_diff = diff
-                melhor_divisao = (grupo_a, grupo_b)
-                if diff == 0: break
-        if melhor_diff == 0: break
+    n = len(pesos)
+    with telemetria.coletar(estatisticas), estatisticas.fase("busca"):
+        # Itera até n//2 + 1 para cobrir todas as combinações únicas de divisão
+        for r in range(n // 2 + 1 + 1): 
+            for combinacao in itertools.combinations(range(n), r):
+                estatisticas.nos += 1
+                peso_a = sum(pesos[i] for i in combinacao) # O grupo B é o resto: peso_b = total - peso_a
+                diff = abs(peso_a - (peso_total - peso_a))
+                
+                if diff < melhor_diff:
+                    melhor_diff = diff
+                    melhor_combinacao = combinacao
+                    if diff == 0:
+                        estatisticas.podar("diferenca_zero")
+                        break
+            if melhor_diff == 0: break
+        
+    with telemetria.coletar(estatisticas), estatisticas.fase("reconstrucao"):
+        no_grupo_a = set(melhor_combinacao)
+        grupo_a, grupo_b = montar_grupos(pecas, list(melhor_combinacao), [i for i in range(n) if i not in no_grupo_a])
             
     tempo = time.time() - inicio
-    return melhor_diff, melhor_divisao[0], melhor_divisao[1], tempo
+    return melhor_diff, grupo_a, grupo_b, tempo, estatisticas
 
 # --- 7. Branch and Bound ---
-def branch_and_bound_particao(pecas):
+def branch_and_bound_particao(pecas, estatisticas=None):
     inicio = time.time()
-    pecas_ordenadas = sorted(pecas, key=lambda p: p.peso, reverse=True)
-    peso_total = sum(p.peso for p in pecas)
+    estatisticas = estatisticas or Estatisticas()
+    pesos, ordem = ordenar_por_peso(pecas)
+    pesos_ordenados = [pesos[i] for i in ordem]
+    peso_total = sum(pesos)
     alvo = peso_total / 2.0
+    sufixos = list(itertools.accumulate(reversed(pesos_ordenados), initial=0))[::-1] # sufixos[i] = soma de pesos_ordenados[i:]
     
     melhor_diff = float('inf')
-    melhor_config = [False] * len(pecas) # False = B, True = A
-    escolha_atual = [False] * len(pecas)
+    melhor_config = [False] * len(pesos) # False = B, True = A
+    escolha_atual = [False] * len(pesos)
 
     def resolver(idx, peso_atual_a):
         nonlocal melhor_diff, melhor_config
+        estatisticas.nos += 1
         
         # Poda: Se já passamos do alvo além do erro atual permitido
         if peso_atual_a - alvo >= (melhor_diff / 2):
+            estatisticas.podar("bound")
             return
 
         # Chegou no fim
-        if idx == len(pecas_ordenadas):
+        if idx == len(pesos_ordenados):
             peso_b = peso_total - peso_atual_a
             diff = abs(peso_atual_a - peso_b)
             if diff < melhor_diff:
                 melhor_diff = diff
                 melhor_config = list(escolha_atual)
+                estatisticas.copias += 1
             return
             
         # Poda Otimista (Lookahead):
         # Se pegarmos TODAS as peças restantes e somarmos ao menor monte, ainda não alcançamos o alvo?
         # (Cálculo simplificado para poda rápida)
-        peso_restante = sum(p.peso for p in pecas_ordenadas[idx:])
+        peso_restante = sufixos[idx]
         max_peso_alcancavel = peso_atual_a + peso_restante
         if max_peso_alcancavel < alvo:
              # O melhor que podemos fazer é max_peso_alcancavel vs (Total - max)
              diff_minima_possivel = (alvo - max_peso_alcancavel) * 2
              if diff_minima_possivel >= melhor_diff:
+                 estatisticas.podar("inviavel")
                  return
 
         # Ramo 1: Colocar no Grupo A
         escolha_atual[idx] = True
-        resolver(idx + 1, peso_atual_a + pecas_ordenadas[idx].peso)
-        if melhor_diff == 0: return
+        resolver(idx + 1, peso_atual_a + pesos_ordenados[idx])
+        if melhor_diff == 0:
+            estatisticas.podar("diferenca_zero")
+            return
 
         # Ramo 2: Colocar no Grupo B
         escolha_atual[idx] = False
         resolver(idx + 1, peso_atual_a)
 
-    resolver(0, 0)
-    
-    grupo_a = []
-    grupo_b = []
-    for i, foi_para_a in enumerate(melhor_config):
-        if foi_para_a: grupo_a.append(pecas_ordenadas[i])
-        else: grupo_b.append(pecas_ordenadas[i])
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("busca"):
+            resolver(0, 0)
+        
+        with estatisticas.fase("reconstrucao"):
+            indices_a = []
+            indices_b = []
+            for i, foi_para_a in enumerate(melhor_config):
+                if foi_para_a: indices_a.append(ordem[i])
+                else: indices_b.append(ordem[i])
+            grupo_a, grupo_b = montar_grupos(pecas, indices_a, indices_b)
             
     tempo = time.time() - inicio
-    return melhor_diff, grupo_a, grupo_b, tempo
+    return melhor_diff, grupo_a, grupo_b, tempo, estatisticas
 
 # --- 8. Heurística (Guloso) ---
-def heuristica_gulosa(pecas):
+def heuristica_gulosa(pecas, estatisticas=None):
     inicio = time.time()
-    pecas_ordenadas = sorted(pecas, key=lambda p: p.peso, reverse=True)
-    grupo_a = []
-    grupo_b = []
-    peso_a = 0
-    peso_b = 0
-    
-    for peca in pecas_ordenadas:
-        if peso_a <= peso_b:
-            grupo_a.append(peca)
-            peso_a += peca.peso
-        else:
-            grupo_b.append(peca)
-            peso_b += peca.peso
+    estatisticas = estatisticas or Estatisticas()
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("ordenacao"):
+            pesos, ordem = ordenar_por_peso(pecas)
+        indices_a = []
+        indices_b = []
+        peso_a = 0
+        peso_b = 0
+        
+        with estatisticas.fase("distribuicao"):
+            for i in ordem:
+                if peso_a <= peso_b:
+                    indices_a.append(i)
+                    peso_a += pesos[i]
+                else:
+                    indices_b.append(i)
+                    peso_b += pesos[i]
+            grupo_a, grupo_b = montar_grupos(pecas, indices_a, indices_b)
             
     diff = abs(peso_a - peso_b)
     tempo = time.time() - inicio
-    return diff, grupo_a, grupo_b, tempo
+    return diff, grupo_a, grupo_b, tempo, estatisticas
+
+# --- 9. Programação Dinâmica (soma de subconjuntos) ---
+# Os pesos são áreas inteiras: marca quais somas até metade do total um subconjunto alcança e fica com a maior delas.
+# Custo O(n * total / 2) em tempo e 5 bytes por soma em memória (1 de alcancavel e 4 de primeiro), bom quando o total (dividido pelo mdc dos pesos) não é enorme.
+def alcance_numpy(pesos, metade, estatisticas): #alcancavel[s]: algum subconjunto soma s; primeiro[s]: peça que alcançou s pela primeira vez
+    alcancavel = np.zeros(metade + 1, dtype=bool)
+    alcancavel[0] = True
+    primeiro = np.full(metade + 1, -1, dtype=np.int32)
+    for i, w in enumerate(pesos):
+        estatisticas.nos += 1
+        if w > metade:
+            continue
+        novas = np.flatnonzero(alcancavel[:metade + 1 - w] & ~alcancavel[w:]) + w # Somas que só passam a existir com a peça i
+        primeiro[novas] = i
+        alcancavel[novas] = True
+        estatisticas.celulas_varridas += metade + 1 - w
+        if alcancavel[metade]: # Metade exata (ou metade do total ímpar arredondada para baixo): nada melhor é possível
+            estatisticas.podar("diferenca_zero")
+            break
+    return int(np.flatnonzero(alcancavel)[-1]), primeiro
+
+def alcance_inteiro(pesos, metade, estatisticas): #mesma ideia sem numpy: o bit s de um inteiro grande diz se a soma s é alcançável
+    mascara = (1 << (metade + 1)) - 1
+    alcance = 1
+    primeiro = array('i', [-1]) * (metade + 1)
+    for i, w in enumerate(pesos):
+        estatisticas.nos += 1
+        if w > metade:
+            continue
+        novas = (alcance << w) & mascara & ~alcance
+        if novas:
+            bits = bin(novas)[:1:-1] # Bit menos significativo primeiro
+            s = bits.find("1")
+            while s != -1:
+                primeiro[s] = i
+                s = bits.find("1", s + 1)
+            alcance |= novas
+        estatisticas.celulas_varridas += metade + 1 - w
+        if alcance >> metade & 1:
+            estatisticas.podar("diferenca_zero")
+            break
+    return alcance.bit_length() - 1, primeiro
+
+def programacao_dinamica_particao(pecas, estatisticas=None):
+    inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    pesos = extrair_pesos(pecas)
+    n = len(pesos)
+    divisor = math.gcd(*pesos) or 1 # Dividir todos os pesos pelo mdc encolhe a tabela sem mudar a resposta
+    reduzidos = [w // divisor for w in pesos]
+    total = sum(reduzidos)
+    metade = total // 2
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("tabela"):
+            if np is not None:
+                melhor_soma, primeiro = alcance_numpy(reduzidos, metade, estatisticas)
+            else:
+                melhor_soma, primeiro = alcance_inteiro(reduzidos, metade, estatisticas)
+        with estatisticas.fase("reconstrucao"):
+            # s - peso[primeiro[s]] já era alcançável antes da peça primeiro[s], então o caminho nunca repete peça
+            no_grupo_a = [False] * n
+            s = melhor_soma
+            while s > 0:
+                i = int(primeiro[s])
+                no_grupo_a[i] = True
+                s -= reduzidos[i]
+            grupo_a, grupo_b = montar_grupos(pecas, [i for i in range(n) if no_grupo_a[i]], [i for i in range(n) if not no_grupo_a[i]])
+    diff = (total - 2 * melhor_soma) * divisor
+    tempo = time.time() - inicio
+    return diff, grupo_a, grupo_b, tempo, estatisticas
+
+# --- 10. Encontro no Meio (Horowitz–Sahni) ---
+# Divide as peças em duas metades, lista as 2^(n/2) somas de subconjuntos de cada uma e, para cada soma da primeira,
+# procura na segunda (ordenada) a que deixa o total mais perto da metade. Não depende do tamanho dos pesos, só de n.
+def somas_numpy(pesos): #soma do subconjunto k: o bit j de k diz se a peça j entra (cada peça dobra a lista)
+    somas = np.zeros(1, dtype=np.int64)
+    for w in pesos:
+        somas = np.concatenate((somas, somas + w))
+    return somas
+
+def somas_gray(pesos): #mesmas somas na ordem do código de Gray: cada passo liga ou desliga uma peça só, em O(1)
+    somas = array('q', [0]) * (1 << len(pesos))
+    soma = 0
+    mascara = 0
+    for passo in range(1, 1 << len(pesos)):
+        j = (passo & -passo).bit_length() - 1 # Peça que muda de lado neste passo
+        mascara ^= 1 << j
+        soma += pesos[j] if mascara >> j & 1 else -pesos[j]
+        somas[mascara] = soma # Guardado na posição da máscara, igual ao somas_numpy
+    return somas
+
+def encontro_no_meio_particao(pecas, estatisticas=None):
+    inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    pesos = extrair_pesos(pecas)
+    n = len(pesos)
+    total = sum(pesos)
+    h = n // 2
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("enumeracao"):
+            enumerar = somas_numpy if np is not None else somas_gray
+            somas_a = enumerar(pesos[:h])
+            somas_b = enumerar(pesos[h:])
+            estatisticas.nos += len(somas_a) + len(somas_b)
+        if np is not None:
+            with estatisticas.fase("ordenacao"):
+                ordem_b = np.argsort(somas_b, kind="stable")
+                ordenadas_b = somas_b[ordem_b]
+            with estatisticas.fase("busca"):
+                # Para cada soma a, as candidatas são as vizinhas de total/2 - a na lista ordenada (comparando em dobro para ficar nos inteiros)
+                posicoes = np.searchsorted(2 * ordenadas_b, total - 2 * somas_a)
+                acima = np.minimum(posicoes, len(ordenadas_b) - 1)
+                abaixo = np.maximum(posicoes - 1, 0)
+                diff_acima = np.abs(total - 2 * (somas_a + ordenadas_b[acima]))
+                diff_abaixo = np.abs(total - 2 * (somas_a + ordenadas_b[abaixo]))
+                usar_abaixo = diff_abaixo < diff_acima
+                diffs = np.where(usar_abaixo, diff_abaixo, diff_acima)
+                mascara_a = int(np.argmin(diffs))
+                mascara_b = int(ordem_b[abaixo[mascara_a] if usar_abaixo[mascara_a] else acima[mascara_a]])
+                diff = int(diffs[mascara_a])
+        else:
+            with estatisticas.fase("ordenacao"):
+                ordem_b = sorted(range(len(somas_b)), key=somas_b.__getitem__)
+                ordenadas_b = [2 * somas_b[k] for k in ordem_b]
+            with estatisticas.fase("busca"):
+                diff = None
+                for k, a in enumerate(somas_a):
+                    posicao = bisect.bisect_left(ordenadas_b, total - 2 * a)
+                    for vizinha in (posicao - 1, posicao):
+                        if 0 <= vizinha < len(ordenadas_b):
+                            d = abs(total - 2 * a - ordenadas_b[vizinha])
+                            if diff is None or d < diff:
+                                diff, mascara_a, mascara_b = d, k, ordem_b[vizinha]
+                    if diff <= total % 2: # Diferença mínima possível: não tem como melhorar
+                        estatisticas.podar("diferenca_zero")
+                        break
+        with estatisticas.fase("reconstrucao"):
+            no_grupo_a = [bool(mascara_a >> j & 1) for j in range(h)] + [bool(mascara_b >> j & 1) for j in range(n - h)]
+            grupo_a, grupo_b = montar_grupos(pecas, [i for i in range(n) if no_grupo_a[i]], [i for i in range(n) if not no_grupo_a[i]])
+    tempo = time.time() - inicio
+    return diff, grupo_a, grupo_b, tempo, estatisticas
+
+# --- 11. Karmarkar–Karp Completo ---
+# Pega sempre os dois maiores números a >= b e decide se ficam em porões opostos (troca os dois por a - b, a escolha do
+# Karmarkar–Karp) ou no mesmo porão (troca por a + b). A primeira folha é a heurística KK; explorando tudo, a resposta é ótima.
+# Quando o maior número é pelo menos a soma dos outros a partição daquele ramo está decidida: maior - resto.
+LIMITE_TEMPO_CKK = 10 #segundos de busca no main; o resultado é o melhor encontrado até o prazo
+
+def karmarkar_karp_completo(pecas, limite_tempo=None, estatisticas=None):
+    inicio = time.time()
+    estatisticas = estatisticas or Estatisticas()
+    pesos = extrair_pesos(pecas)
+    n = len(pesos)
+    soma = sum(pesos)
+    minimo_possivel = soma % 2 # Com total ímpar a diferença nunca é 0
+    pilha = [] # [a, b, ramo] de cada nível aberto
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("heuristica"):
+            # A primeira folha (sempre a diferença) é o Karmarkar–Karp; num heap ela sai em O(n log n), e não em O(n²)
+            # como na lista ordenada. Ela vira o incumbente antes do prazo valer, então nunca sai nada pior que o KK
+            heap = [-w for w in pesos]
+            heapq.heapify(heap)
+            while heap and -2 * heap[0] < soma:
+                estatisticas.nos += 1
+                a = -heapq.heappop(heap)
+                b = -heapq.heappop(heap)
+                pilha.append([a, b, False])
+                heapq.heappush(heap, b - a)
+                soma -= 2 * b
+            estatisticas.nos += 1
+            melhor_diff = -2 * heap[0] - soma if heap else 0
+            decisoes = [False] * len(pilha)
+            melhor_decisoes = list(decisoes) # Caminho até a melhor folha: False = diferença, True = soma
+            numeros = sorted(-x for x in heap) # Em ordem crescente, os dois maiores ficam no fim
+            del heap
+        with estatisticas.fase("busca"):
+            descer = False # A busca começa voltando da folha do KK
+            passos = 0
+            if melhor_diff <= minimo_possivel: # Partição perfeita, nada pode ser melhor
+                estatisticas.podar("diferenca_zero")
+                pilha = []
+            while True:
+                passos += 1 # Conta também as voltas: uma sequência longa de podas não pode passar do prazo
+                if limite_tempo is not None and passos % 1024 == 0 and time.time() - inicio >= limite_tempo:
+                    estatisticas.podar("prazo") # Busca interrompida: fica a melhor partição encontrada
+                    break
+                if descer:
+                    estatisticas.nos += 1
+                    maior = numeros[-1] if numeros else 0
+                    if 2 * maior >= soma: # Folha: o maior vai sozinho para um porão, todo o resto para o outro
+                        if 2 * maior - soma < melhor_diff:
+                            melhor_diff = 2 * maior - soma
+                            melhor_decisoes = list(decisoes)
+                            if melhor_diff <= minimo_possivel: # Partição perfeita, nada pode ser melhor
+                                estatisticas.podar("diferenca_zero")
+                                break
+                        descer = False
+                    else:
+                        a = numeros.pop()
+                        b = numeros.pop()
+                        pilha.append([a, b, False])
+                        bisect.insort(numeros, a - b)
+                        soma -= 2 * b
+                        decisoes.append(False)
+                        continue
+                if not pilha:
+                    break
+                nivel = pilha[-1]
+                a, b, ramo = nivel
+                if not ramo: # Volta do ramo da diferença e tenta o da soma
+                    del numeros[bisect.bisect_left(numeros, a - b)]
+                    soma += 2 * b
+                    decisoes.pop()
+                    if (a + b) - (soma - a - b) >= melhor_diff: # a + b já seria o maior, e a folha dele não melhora o incumbente
+                        estatisticas.podar("bound")
+                    else:
+                        nivel[2] = True
+                        bisect.insort(numeros, a + b)
+                        decisoes.append(True)
+                        descer = True
+                        continue
+                else:
+                    del numeros[bisect.bisect_left(numeros, a + b)]
+                    decisoes.pop()
+                bisect.insort(numeros, b)
+                bisect.insort(numeros, a)
+                pilha.pop()
+        with estatisticas.fase("reconstrucao"):
+            # Refaz o caminho da melhor folha guardando a árvore de combinações: o nó k tem filhos (esquerdo, direito) e
+            # o direito fica no mesmo porão do esquerdo numa soma, ou no oposto numa diferença
+            # (num heap de máximo, como a descida do KK)
+            numeros = [(-w, i) for i, w in enumerate(pesos)]
+            heapq.heapify(numeros)
+            filhos = []
+            for mesmo_porao in melhor_decisoes:
+                a, no_a = heapq.heappop(numeros)
+                b, no_b = heapq.heappop(numeros)
+                filhos.append((no_a, no_b, mesmo_porao))
+                heapq.heappush(numeros, (a + b if mesmo_porao else a - b, n + len(filhos) - 1))
+            porao = [0] * (n + len(filhos))
+            pendentes = []
+            for k, (_, no) in enumerate(sorted(numeros)): # O maior fica no porão 1, os outros no porão 2
+                porao[no] = 0 if k == 0 else 1
+                pendentes.append(no)
+            while pendentes:
+                no = pendentes.pop()
+                if no >= n:
+                    no_a, no_b, mesmo_porao = filhos[no - n]
+                    porao[no_a] = porao[no]
+                    porao[no_b] = porao[no] if mesmo_porao else 1 - porao[no]
+                    pendentes.extend((no_a, no_b))
+            grupo_a, grupo_b = montar_grupos(pecas, [i for i in range(n) if porao[i] == 0], [i for i in range(n) if porao[i] == 1])
+            diff = abs(sum(w if porao[i] == 0 else -w for i, w in enumerate(pesos))) # Sempre a diferença dos grupos devolvidos
+    tempo = time.time() - inicio
+    return diff, grupo_a, grupo_b, tempo, estatisticas
+
+# --- 12. Seleção Automática do Método Exato ---
+# Acima de poucas peças o branch and bound é exponencial (e recursivo, uma chamada por peça). Entre a programação dinâmica,
+# que custa n * (total / 2), e o encontro no meio, que custa cerca de 2^(n/2) * n/2, fica a mais barata das que cabem na memória.
+# Se nenhuma cabe, o Karmarkar–Karp completo: iterativo, sem limite de memória, e costuma achar logo uma partição perfeita
+LIMITE_PECAS_BRANCH_AND_BOUND = 20 #até aqui o branch and bound resolve em no máximo 2^20 nós
+LIMITE_MEMORIA_PD = 512 * 2**20 #bytes da tabela de somas (5 bytes por soma: alcancavel + primeiro)
+LIMITE_PECAS_ENCONTRO_NO_MEIO = 44 #2^22 somas por metade, uns 250 MB nos vetores da busca
+
+def cabe_na_programacao_dinamica(pecas): #tabela da programação dinâmica dentro do limite de memória
+    pesos = extrair_pesos(pecas)
+    metade = sum(pesos) // (math.gcd(*pesos) or 1) // 2
+    return 5 * metade <= LIMITE_MEMORIA_PD
+
+def escolher_metodo_exato(pecas): #nome do método exato mais rápido para a instância
+    n = len(pecas)
+    if n <= LIMITE_PECAS_BRANCH_AND_BOUND:
+        return "branch_and_bound"
+    custos = {}
+    if cabe_na_programacao_dinamica(pecas):
+        pesos = extrair_pesos(pecas)
+        custos["programacao_dinamica"] = n * (sum(pesos) // (math.gcd(*pesos) or 1) // 2)
+    if n <= LIMITE_PECAS_ENCONTRO_NO_MEIO:
+        custos["encontro_no_meio"] = 2 ** ((n + 1) // 2) * ((n + 1) // 2)
+    if not custos:
+        return "karmarkar_karp"
+    return min(custos, key=custos.get)
+
+def particao_exata(pecas, limite_tempo=None, estatisticas=None): #limite_tempo só vale para o Karmarkar–Karp completo; os outros métodos têm custo previsível
+    metodo = escolher_metodo_exato(pecas)
+    if metodo == "programacao_dinamica":
+        return programacao_dinamica_particao(pecas, estatisticas)
+    if metodo == "encontro_no_meio":
+        return encontro_no_meio_particao(pecas, estatisticas)
+    if metodo == "karmarkar_karp":
+        return karmarkar_karp_completo(pecas, limite_tempo=limite_tempo, estatisticas=estatisticas)
+    return branch_and_bound_particao(pecas, estatisticas)
+
+# --- 13. Partição em k Porões ---
+# Mesmo problema com k porões: minimizar a diferença entre o porão mais pesado e o mais leve. Os dois primeiros métodos
+# são heurísticas polinomiais (sempre terminam); o branch and bound parte da melhor delas e, com prazo, devolve a melhor
+# distribuição encontrada até ali. Todos devolvem (desequilibrio, poroes, tempo, estatisticas), poroes com k grupos.
+LIMITE_TEMPO_POROES = 10 #segundos de busca do branch and bound no main
+POROES_MAIN = 3 #porões usados na demonstração do main
+
+def validar_poroes(k):
+    if k < 1:
+        raise ValueError(f"Número de porões inválido: {k}")
+
+def distribuir_lpt(pesos, ordem, k, estatisticas): #guloso LPT: cada peça (da mais pesada) vai para o porão mais leve, O(n log k)
+    heap = [(0, j) for j in range(k)] # (carga, porão); empate vai para o porão de menor número, como na heurística de 2 porões
+    indices = [[] for _ in range(k)]
+    for i in ordem:
+        estatisticas.nos += 1
+        carga, j = heapq.heappop(heap)
+        indices[j].append(i)
+        heapq.heappush(heap, (carga + pesos[i], j))
+    cargas = [0] * k
+    for carga, j in heap:
+        cargas[j] = carga
+    return cargas, indices
+
+def distribuir_diferencas(pesos, k, estatisticas): #Karmarkar–Karp de k vias
+    # Cada peça começa como uma partição parcial (peso, 0, ..., 0). Junta sempre as duas partições de maior espalhamento
+    # (mais pesado - mais leve), somando o porão mais pesado de uma com o mais leve da outra. Os porões guardam um nó da
+    # árvore de combinações (folhas 0..n-1 são as peças, -1 é porão vazio) para não copiar listas de índices a cada junção
+    n = len(pesos)
+    filhos = []
+    def juntar(x, y):
+        if x == -1 or y == -1:
+            return max(x, y)
+        filhos.append((x, y))
+        return n + len(filhos) - 1
+    heap = []
+    for i, w in enumerate(pesos):
+        heap.append((-w, i, [(w, i)] + [(0, -1)] * (k - 1)))
+    heapq.heapify(heap)
+    contador = n # Desempate do heap sem comparar as listas
+    while len(heap) > 1:
+        estatisticas.nos += 1
+        _, _, a = heapq.heappop(heap)
+        _, _, b = heapq.heappop(heap)
+        juntos = sorted(((a[j][0] + b[k - 1 - j][0], juntar(a[j][1], b[k - 1 - j][1])) for j in range(k)), reverse=True)
+        heapq.heappush(heap, (juntos[-1][0] - juntos[0][0], contador, juntos))
+        contador += 1
+    particao = heap[0][2] if heap else [(0, -1)] * k
+    cargas = [carga for carga, _ in particao]
+    indices = []
+    for _, no in particao:
+        folhas = []
+        pendentes = [no] if no != -1 else []
+        while pendentes:
+            no = pendentes.pop()
+            if no >= n:
+                pendentes.extend(filhos[no - n])
+            else:
+                folhas.append(no)
+        indices.append(sorted(folhas))
+    return cargas, indices
+
+def heuristica_gulosa_poroes(pecas, k, estatisticas=None):
+    inicio = time.time()
+    validar_poroes(k)
+    estatisticas = estatisticas or Estatisticas()
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("ordenacao"):
+            pesos, ordem = ordenar_por_peso(pecas)
+        with estatisticas.fase("distribuicao"):
+            cargas, indices = distribuir_lpt(pesos, ordem, k, estatisticas)
+            poroes = montar_poroes(pecas, indices)
+    tempo = time.time() - inicio
+    return max(cargas) - min(cargas), poroes, tempo, estatisticas
+
+def karmarkar_karp_poroes(pecas, k, estatisticas=None):
+    inicio = time.time()
+    validar_poroes(k)
+    estatisticas = estatisticas or Estatisticas()
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("diferencas"):
+            cargas, indices = distribuir_diferencas(extrair_pesos(pecas), k, estatisticas)
+        with estatisticas.fase("reconstrucao"):
+            poroes = montar_poroes(pecas, indices)
+    tempo = time.time() - inicio
+    return max(cargas) - min(cargas), poroes, tempo, estatisticas
+
+def branch_and_bound_poroes(pecas, k, limite_tempo=None, estatisticas=None):
+    inicio = time.time()
+    validar_poroes(k)
+    estatisticas = estatisticas or Estatisticas()
+    pesos, ordem = ordenar_por_peso(pecas)
+    ordenados = [pesos[i] for i in ordem]
+    n = len(ordenados)
+    total = sum(ordenados)
+    media = total / k
+    minimo_possivel = 0 if total % k == 0 else 1 # Pesos inteiros: com total não divisível algum porão fica 1 acima de outro
+    sufixos = list(itertools.accumulate(reversed(ordenados), initial=0))[::-1] # sufixos[i] = soma de ordenados[i:]
+    with telemetria.coletar(estatisticas):
+        with estatisticas.fase("heuristica_inicial"):
+            candidatas = [distribuir_lpt(pesos, ordem, k, estatisticas), distribuir_diferencas(pesos, k, estatisticas)]
+            cargas, melhor_indices = min(candidatas, key=lambda c: max(c[0]) - min(c[0]))
+            melhor = max(cargas) - min(cargas)
+            melhor_escolha = None
+
+        def abrir(idx): #porões para a peça idx, do mais leve para o mais pesado (a lista é consumida do fim)
+            # Simetria: porões com a mesma carga (os vazios, por exemplo) geram subárvores iguais, só o primeiro é tentado
+            vistos = set()
+            abertos = []
+            for j in sorted(range(k), key=cargas.__getitem__):
+                if cargas[j] in vistos:
+                    estatisticas.podar("simetria")
+                    continue
+                vistos.add(cargas[j])
+                abertos.append(j)
+            return abertos[::-1]
+
+        with estatisticas.fase("busca"):
+            if melhor > minimo_possivel and n > 0:
+                # Busca em profundidade com pilha explícita (uma peça por nível), da peça mais pesada para a mais leve
+                cargas = [0] * k
+                escolha = [-1] * n
+                pilha = [abrir(0)]
+                while pilha:
+                    idx = len(pilha) - 1
+                    if escolha[idx] >= 0: # Desfaz a tentativa anterior deste nível
+                        cargas[escolha[idx]] -= ordenados[idx]
+                        escolha[idx] = -1
+                    if not pilha[-1]:
+                        pilha.pop()
+                        continue
+                    j = pilha[-1].pop()
+                    cargas[j] += ordenados[idx]
+                    escolha[idx] = j
+                    estatisticas.nos += 1
+                    if limite_tempo is not None and estatisticas.nos % 1024 == 0 and time.time() - inicio >= limite_tempo:
+                        estatisticas.podar("prazo") # Busca interrompida: fica a melhor distribuição encontrada
+                        break
+                    if idx + 1 == n:
+                        if max(cargas) - min(cargas) < melhor:
+                            melhor = max(cargas) - min(cargas)
+                            melhor_escolha = list(escolha)
+                            estatisticas.copias += 1
+                            if melhor <= minimo_possivel:
+                                estatisticas.podar("diferenca_zero")
+                                break
+                        continue
+                    # Limite inferior: o mais pesado termina com pelo menos max(carga atual, média) e o mais leve com no
+                    # máximo min(carga atual + tudo o que falta, média)
+                    if max(max(cargas), media) - min(min(cargas) + sufixos[idx + 1], media) >= melhor:
+                        estatisticas.podar("bound")
+                        continue
+                    pilha.append(abrir(idx + 1))
+
+        with estatisticas.fase("reconstrucao"):
+            if melhor_escolha is not None:
+                melhor_indices = [[] for _ in range(k)]
+                for idx, j in enumerate(melhor_escolha):
+                    melhor_indices[j].append(ordem[idx])
+            poroes = montar_poroes(pecas, melhor_indices)
+    tempo = time.time() - inicio
+    return melhor, poroes, tempo, estatisticas
 
 # --- Main ---
-def main():
+def main(arquivo="entrada4.txt"):
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    caminho_entrada = os.path.join(script_dir, "entrada4.txt") # ALERTA: Mude o arquivo aqui se necessário
+    caminho_entrada = os.path.join(script_dir, arquivo) # Caminhos relativos são procurados na pasta do script
     
     print(f"Lendo: {caminho_entrada}")
     pecas = ler_entrada(caminho_entrada)
@@ -230,18 +758,45 @@ def main():
 
     # 1. Força Bruta (Limitado para não travar o PC se tiver muitas peças)
     if len(pecas) <= 20: 
-        diff, ga, gb, tempo = forca_bruta_particao(pecas)
-        exibir_e_desenhar("FORÇA BRUTA", diff, ga, gb, tempo)
+        diff, ga, gb, tempo, estatisticas = forca_bruta_particao(pecas)
+        exibir_e_desenhar("FORÇA BRUTA", diff, ga, gb, tempo, estatisticas)
     else:
         print("Muitas peças para Força Bruta. Pulando...")
 
     # 2. Branch and Bound
-    diff, ga, gb, tempo = branch_and_bound_particao(pecas)
-    exibir_e_desenhar("BRANCH AND BOUND", diff, ga, gb, tempo)
+    diff, ga, gb, tempo, estatisticas = branch_and_bound_particao(pecas)
+    exibir_e_desenhar("BRANCH AND BOUND", diff, ga, gb, tempo, estatisticas)
 
     # 3. Heurística
-    diff, ga, gb, tempo = heuristica_gulosa(pecas)
-    exibir_e_desenhar("HEURÍSTICA", diff, ga, gb, tempo)
+    diff, ga, gb, tempo, estatisticas = heuristica_gulosa(pecas)
+    exibir_e_desenhar("HEURÍSTICA", diff, ga, gb, tempo, estatisticas)
+
+    # 4. Programação Dinâmica (exata, pseudo-polinomial no peso total)
+    if cabe_na_programacao_dinamica(pecas):
+        diff, ga, gb, tempo, estatisticas = programacao_dinamica_particao(pecas)
+        exibir_e_desenhar("PROGRAMAÇÃO DINÂMICA", diff, ga, gb, tempo, estatisticas)
+    else:
+        print("Peso total grande demais para a Programação Dinâmica. Pulando...")
+
+    # 5. Encontro no Meio (exato, 2^(n/2) somas por metade)
+    if len(pecas) <= LIMITE_PECAS_ENCONTRO_NO_MEIO:
+        diff, ga, gb, tempo, estatisticas = encontro_no_meio_particao(pecas)
+        exibir_e_desenhar("ENCONTRO NO MEIO", diff, ga, gb, tempo, estatisticas)
+    else:
+        print("Muitas peças para o Encontro no Meio. Pulando...")
+
+    # 6. Karmarkar–Karp Completo (a primeira folha é a heurística KK; ótimo se terminar antes do prazo)
+    diff, ga, gb, tempo, estatisticas = karmarkar_karp_completo(pecas, limite_tempo=LIMITE_TEMPO_CKK)
+    exibir_e_desenhar("KARMARKAR-KARP COMPLETO", diff, ga, gb, tempo, estatisticas)
+
+    # 7. Partição em k porões (mais pesado - mais leve)
+    print(f"--- {POROES_MAIN} porões ---")
+    desequilibrio, poroes, tempo, estatisticas = heuristica_gulosa_poroes(pecas, POROES_MAIN)
+    exibir_e_desenhar_poroes("HEURÍSTICA (LPT)", desequilibrio, poroes, tempo, estatisticas)
+    desequilibrio, poroes, tempo, estatisticas = karmarkar_karp_poroes(pecas, POROES_MAIN)
+    exibir_e_desenhar_poroes("KARMARKAR-KARP (k VIAS)", desequilibrio, poroes, tempo, estatisticas)
+    desequilibrio, poroes, tempo, estatisticas = branch_and_bound_poroes(pecas, POROES_MAIN, limite_tempo=LIMITE_TEMPO_POROES)
+    exibir_e_desenhar_poroes("BRANCH AND BOUND (k PORÕES)", desequilibrio, poroes, tempo, estatisticas)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(*sys.argv[1:2])
\ No newline at end of file